@@ -1,39 +1,61 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
+import argparse
 import asyncio
-import builtins
-import contextvars
-import functools
 import json
 import logging
 import os
+import queue
+import random
+import re
+import signal
 import sys
-import time
-import urllib.error
-import urllib.request
-from concurrent.futures import ThreadPoolExecutor
+import weakref
 from dataclasses import dataclass
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
-from typing import Any, Coroutine
+from typing import Any, Awaitable, Callable
 
-import tomli as tomllib
+import httpx
 
-from bot.telegram_adapter import parse_update, split_telegram_text
+from bot.telegram_adapter import TelegramInboundMessage, parse_update, split_telegram_text
 from integrations.codex_executor import (
     AgentTextNotification,
     EchoCodexExecutor,
     OpenAIAgentsExecutor,
 )
+from core.models import local_timestamp
+from core.profiles import load_conf_toml
 from main import build_orchestrator
-from workflows.plan_agent_workflow import (
-    _AGENT_TRANSFER_CALLBACK,
-    _MODE_SELECT_CALLBACK,
-)
+
+try:  # Optional dependency; fall back to the default asyncio loop without uvloop.
+    import uvloop
+except ImportError:
+    uvloop = None
+
+try:  # Optional dependency; fall back to the stdlib json codec without orjson.
+    import orjson
+except ImportError:
+    orjson = None
 
 _VERSION = "0.2.1"
+_TELEGRAM_API_HOST = "api.telegram.org"
+_HTTP_TIMEOUT_SEC = 70
+_LONG_POLL_READ_MARGIN_SEC = 10
+_GET_UPDATES_BODY = b'{"timeout":%d,"allowed_updates":["message","edited_message"]%s}'
+_GET_UPDATES_BATCH_LIMIT = 100
+# Safe to send twice: a repeated getUpdates returns the same batch for the same
+# offset, and deleteWebhook is idempotent. sendMessage is never retried, since a
+# dropped response does not prove the message was not delivered.
+_RETRYABLE_METHODS = frozenset({"getUpdates", "deleteWebhook"})
+# The fetcher blocks on a full inbound queue before confirming the batch with
+# the next getUpdates offset, so a backlog stays on Telegram's side.
+_INBOUND_QUEUE_MAXSIZE = 64
+_POLL_ERROR_BACKOFF_MAX_SEC = 60.0
+_OUTBOUND_COALESCE_SEC = 0.05
+_CHAT_BACKLOG_MAXSIZE = 5
 
-_BLOCKING_POOL = ThreadPoolExecutor(max_workers=8)
 _DEFAULT_CONF_PATH = Path.home() / ".codex-orchestrator" / "conf.toml"
 _DEFAULT_CONF_TEMPLATE = (
     "[telegram]\n"
@@ -84,10 +106,16 @@ _DEFAULT_CONF_TEMPLATE = (
     "model = \"gpt-5\"\n"
     "working_directory = \"~/develop/bridge-project\"\n"
 )
+_DEFAULT_CONF_BYTES = _DEFAULT_CONF_TEMPLATE.encode("utf-8")
 _UNAUTHORIZED_MESSAGE = "Unauthorized"
+_MCP_VALIDATION_MARKER = "Failed to validate notification:"
+_CODEX_EVENT_MARKER = "codex/event"
+# Older mcp releases warn through the root logger; newer ones use "client".
+_MCP_NOISE_LOGGER_NAMES = ("", "client")
+_CANCEL_COMMAND_RE = re.compile(r"\s*/cancel(?:@\S*)?(?:\s|$)", re.IGNORECASE)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class _PollingConfig:
     poll_timeout: int = 30
     loop_sleep_sec: float = 1.0
@@ -98,45 +126,47 @@ class _PollingConfig:
     cancel_wait_timeout_sec: float = 5.0
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class _RunnerConfig:
-    allowed_users: set[str] | None
+    allowed_users: frozenset[int | str] | None
     polling: _PollingConfig
 
 
-_MODE_SELECT_CALLBACK: contextvars.ContextVar[
-    Any | None
-] = contextvars.ContextVar("mode_select_callback", default=None)
+# Parsed runner config keyed by resolved path; entries are reused until the
+# file's (mtime_ns, size) changes.
+_RUNNER_CONFIG_CACHE: dict[Path, tuple[tuple[int, int], _RunnerConfig]] = {}
 
 
 class _SuppressMcpValidationNoiseFilter(logging.Filter):
     def filter(self, record: logging.LogRecord) -> bool:
-        message = record.getMessage()
-        return not (
-            "Failed to validate notification:" in message
-            and "codex/event" in message
-        )
+        # mcp reports validation failures at WARNING; skip formatting for everything else.
+        if record.levelno < logging.WARNING:
+            return True
+        if record.args or not isinstance(record.msg, str):
+            message = record.getMessage()
+        else:
+            message = record.msg
+        marker_at = message.find(_MCP_VALIDATION_MARKER)
+        if marker_at < 0:
+            return True
+        return message.find(_CODEX_EVENT_MARKER, marker_at) < 0
 
 
-def _stdout_print(
-    *values: object,
-    **kwargs: Any,
-) -> None:
-    file = kwargs.get("file")
-    target = sys.stdout if file is None else file
-    if target is sys.stdout:
-        timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
-        if values:
-            normalized_values: list[object] = list(values)
-            first_value = str(normalized_values[0])
-            normalized_values[0] = "\n".join(
-                f"[{timestamp}] {line}" for line in first_value.splitlines() or [""]
-            )
-            values = tuple(normalized_values)
-        else:
-            values = (f"[{timestamp}]",)
+_LOGGER = logging.getLogger("codex_orchestrator.runner")
+_log_listener: QueueListener | None = None
+_noise_filter: logging.Filter | None = None
 
-    builtins.print(*values, **kwargs)
+
+def _log(message: str, *, flush: bool = False) -> None:
+    timestamp = local_timestamp()
+    text = "\n".join(f"[{timestamp}] {line}" for line in message.splitlines() or [""])
+    if _log_listener is not None:
+        # The listener thread writes and flushes each line off the event loop.
+        _LOGGER.info(text)
+        return
+    sys.stdout.write(text + "\n")
+    if flush:
+        sys.stdout.flush()
 
 
 @dataclass
@@ -144,26 +174,57 @@ class TelegramBotApi:
     token: str
 
     def __post_init__(self) -> None:
-        self.base_url = f"https://api.telegram.org/bot{self.token}"
+        self.base_path = f"/bot{self.token}"
+        self._async_client: httpx.AsyncClient | None = None
 
-    def _post(self, method: str, payload: dict[str, Any]) -> Any:
-        body = json.dumps(payload).encode("utf-8")
-        request = urllib.request.Request(
-            url=f"{self.base_url}/{method}",
-            data=body,
+    async def _post_async(
+        self,
+        method: str,
+        payload: dict[str, Any] | bytes,
+        *,
+        timeout: float = _HTTP_TIMEOUT_SEC,
+    ) -> Any:
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(
+                base_url=f"https://{_TELEGRAM_API_HOST}",
+                timeout=_HTTP_TIMEOUT_SEC,
+            )
+        body = self._encode_payload(payload)
+        try:
+            try:
+                response = await self._send(method, body, timeout)
+            except httpx.RemoteProtocolError:
+                # The server closed a pooled connection without answering.
+                if method not in _RETRYABLE_METHODS:
+                    raise
+                response = await self._send(method, body, timeout)
+        except httpx.HTTPError as exc:
+            raise RuntimeError(f"telegram request failed: {exc}") from exc
+
+        return self._parse_response(response.content)
+
+    async def _send(self, method: str, body: bytes, timeout: float) -> httpx.Response:
+        return await self._async_client.post(
+            f"{self.base_path}/{method}",
+            content=body,
             headers={"Content-Type": "application/json"},
-            method="POST",
+            timeout=timeout,
         )
 
-        try:
-            with urllib.request.urlopen(request, timeout=70) as response:
-                raw = response.read().decode("utf-8")
-        except urllib.error.URLError as exc:
-            raise RuntimeError(f"telegram request failed: {exc}") from exc
+    @staticmethod
+    def _encode_payload(payload: dict[str, Any] | bytes) -> bytes:
+        if isinstance(payload, bytes):
+            return payload
+        if orjson is not None:
+            return orjson.dumps(payload)
+        return json.dumps(payload).encode("utf-8")
 
+    @staticmethod
+    def _parse_response(raw_bytes: bytes) -> Any:
         try:
-            payload_json = json.loads(raw)
-        except json.JSONDecodeError as exc:
+            payload_json = orjson.loads(raw_bytes) if orjson is not None else json.loads(raw_bytes)
+        except ValueError as exc:
+            raw = raw_bytes.decode("utf-8", errors="replace")
             raise RuntimeError(f"telegram response is not valid json: {raw}") from exc
 
         if not payload_json.get("ok"):
@@ -172,28 +233,44 @@ class TelegramBotApi:
 
         return payload_json.get("result")
 
-    def delete_webhook(self, drop_pending_updates: bool = False) -> None:
-        self._post(
+    async def aclose(self) -> None:
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+
+    async def delete_webhook(self, drop_pending_updates: bool = False) -> None:
+        await self._post_async(
             "deleteWebhook",
             {
                 "drop_pending_updates": drop_pending_updates,
             },
         )
 
-    def get_updates(self, *, offset: int | None, timeout: int) -> list[dict[str, Any]]:
-        payload: dict[str, Any] = {
-            "timeout": timeout,
-            "allowed_updates": ["message", "edited_message"],
-        }
-        if offset is not None:
-            payload["offset"] = offset
-        result = self._post("getUpdates", payload)
+    @staticmethod
+    def _get_updates_body(offset: int | None, timeout: int) -> bytes:
+        # Only offset and timeout change between polls, so the body is built
+        # from a pre-encoded template instead of json.dumps on a fresh dict.
+        offset_part = b"" if offset is None else b',"offset":%d' % offset
+        return _GET_UPDATES_BODY % (timeout, offset_part)
+
+    @staticmethod
+    def _updates_from_result(result: Any) -> list[dict[str, Any]]:
         if not isinstance(result, list):
             return []
         return [item for item in result if isinstance(item, dict)]
 
-    def send_message(self, *, chat_id: str, text: str) -> None:
-        self._post(
+    async def get_updates_async(self, *, offset: int | None, timeout: int) -> list[dict[str, Any]]:
+        # Telegram holds the request open for up to `timeout` seconds, so the
+        # read must wait a little longer than that.
+        result = await self._post_async(
+            "getUpdates",
+            self._get_updates_body(offset, timeout),
+            timeout=timeout + _LONG_POLL_READ_MARGIN_SEC,
+        )
+        return self._updates_from_result(result)
+
+    async def send_message_async(self, *, chat_id: str, text: str) -> None:
+        await self._post_async(
             "sendMessage",
             {
                 "chat_id": chat_id,
@@ -203,9 +280,36 @@ class TelegramBotApi:
 
 
 def _configure_logging() -> None:
+    global _log_listener, _noise_filter
     root = logging.getLogger()
     root.setLevel(logging.INFO)
-    root.addFilter(_SuppressMcpValidationNoiseFilter())
+    # Logger filters only see records created on that logger, so unrelated
+    # libraries never pay for the message check.
+    _noise_filter = _SuppressMcpValidationNoiseFilter()
+    for name in _MCP_NOISE_LOGGER_NAMES:
+        logging.getLogger(name).addFilter(_noise_filter)
+
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    _LOGGER.addHandler(QueueHandler(log_queue))
+    _LOGGER.setLevel(logging.INFO)
+    _LOGGER.propagate = False
+    _log_listener = QueueListener(log_queue, logging.StreamHandler(sys.stdout))
+    _log_listener.start()
+
+
+def _stop_logging() -> None:
+    global _log_listener, _noise_filter
+    if _noise_filter is not None:
+        for name in _MCP_NOISE_LOGGER_NAMES:
+            logging.getLogger(name).removeFilter(_noise_filter)
+        _noise_filter = None
+    if _log_listener is None:
+        return
+    _log_listener.stop()
+    _log_listener = None
+    for handler in list(_LOGGER.handlers):
+        if isinstance(handler, QueueHandler):
+            _LOGGER.removeHandler(handler)
 
 
 def _resolve_conf_path(raw_path: str | Path) -> Path:
@@ -220,30 +324,32 @@ def _ensure_conf_exists(path: Path) -> None:
         return
     try:
         path.parent.mkdir(parents=True, exist_ok=True)
-        path.write_text(_DEFAULT_CONF_TEMPLATE, encoding="utf-8")
+        # O_EXCL keeps a concurrent first run from clobbering a conf written
+        # after the exists() check above.
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        return
+    except OSError as exc:
+        raise ValueError(f"failed to create default conf file at {path}: {exc}") from exc
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(_DEFAULT_CONF_BYTES)
     except OSError as exc:
         raise ValueError(f"failed to create default conf file at {path}: {exc}") from exc
 
 
-def _load_toml_payload(conf_path: Path) -> dict[str, Any]:
+def _conf_stat_key(conf_path: Path) -> tuple[int, int]:
     try:
-        import tomllib
-    except Exception as exc:
-        try:
-            import tomli as tomllib
-        except Exception as tomli_exc:
-            raise RuntimeError(
-                "TOML parser is required. Use Python 3.11+ or install package `tomli`."
-            ) from tomli_exc
+        stat = conf_path.stat()
+    except OSError as exc:
+        raise ValueError(f"failed to read {conf_path}: {exc}") from exc
+    return stat.st_mtime_ns, stat.st_size
 
-    try:
-        payload = tomllib.loads(conf_path.read_text(encoding="utf-8"))
-    except Exception as exc:
-        raise ValueError(f"failed to parse {conf_path}: {exc}") from exc
 
-    if not isinstance(payload, dict):
-        raise ValueError(f"{conf_path}: root must be a table")
-    return payload
+def _load_toml_payload(conf_path: Path) -> dict[str, Any]:
+    # Shares core.profiles' stat-keyed cache with build_orchestrator, so both
+    # see the same parse of the conf file.
+    return load_conf_toml(conf_path)
 
 
 def _optional_bool(*, value: Any, conf_path: Path, key_name: str, default: bool) -> bool:
@@ -270,35 +376,49 @@ def _optional_positive_float(*, value: Any, conf_path: Path, key_name: str, defa
     return float(value)
 
 
+def _allowlist_key(raw_id: str) -> int | str:
+    # Telegram ids are integers; keep anything else verbatim so it can still be compared.
+    digits = raw_id[1:] if raw_id.startswith("-") else raw_id
+    if digits.isascii() and digits.isdigit():
+        return int(raw_id)
+    return raw_id
+
+
 def _parse_id_allowlist(
     *,
     value: Any,
     conf_path: Path,
     key_name: str,
     allow_csv_string: bool,
-) -> set[str] | None:
+) -> frozenset[int | str] | None:
     if value is None:
         return None
 
     if allow_csv_string and isinstance(value, str):
-        normalized = {piece.strip() for piece in value.split(",") if piece.strip()}
+        normalized = frozenset(
+            _allowlist_key(piece.strip()) for piece in value.split(",") if piece.strip()
+        )
         return normalized or None
 
     if not isinstance(value, list):
         raise ValueError(f"{conf_path}: {key_name} must be a list")
 
-    parsed: set[str] = set()
+    parsed: set[int | str] = set()
     for item in value:
         if isinstance(item, (int, str)):
             normalized = str(item).strip()
             if normalized:
-                parsed.add(normalized)
+                parsed.add(_allowlist_key(normalized))
             continue
         raise ValueError(f"{conf_path}: {key_name} supports only int/string items")
-    return parsed or None
+    return frozenset(parsed) or None
 
 
-def _parse_allowed_users_from_payload(*, payload: dict[str, Any], conf_path: Path) -> set[str] | None:
+def _parse_allowed_users_from_payload(
+    *,
+    payload: dict[str, Any],
+    conf_path: Path,
+) -> frozenset[int | str] | None:
     telegram = payload.get("telegram")
     if telegram is None:
         return None
@@ -378,44 +498,74 @@ def _parse_polling_config_from_payload(
 def _load_runner_config_from_conf(conf_path: str) -> tuple[Path, _RunnerConfig]:
     path = _resolve_conf_path(conf_path)
     _ensure_conf_exists(path)
+    stat_key = _conf_stat_key(path)
+    cached = _RUNNER_CONFIG_CACHE.get(path)
+    if cached is not None and cached[0] == stat_key:
+        return path, cached[1]
+
     payload = _load_toml_payload(path)
-    return path, _RunnerConfig(
+    runner_conf = _RunnerConfig(
         allowed_users=_parse_allowed_users_from_payload(payload=payload, conf_path=path),
         polling=_parse_polling_config_from_payload(payload=payload, conf_path=path),
     )
+    _RUNNER_CONFIG_CACHE[path] = (stat_key, runner_conf)
+    return path, runner_conf
 
 
-def _load_allowed_users_from_conf(conf_path: str) -> set[str] | None:
+def _load_allowed_users_from_conf(conf_path: str) -> frozenset[int | str] | None:
     _, runner_conf = _load_runner_config_from_conf(conf_path)
     return runner_conf.allowed_users
 
 
-def _safe_send(api: TelegramBotApi, chat_id: str, text: str) -> None:
-    for chunk in split_telegram_text(text):
-        try:
-            api.send_message(chat_id=chat_id, text=chunk)
-        except Exception as exc:
-            _stdout_print(f"[warn] failed to send telegram message: {exc}")
+_chat_send_locks: weakref.WeakValueDictionary[str, asyncio.Lock] = weakref.WeakValueDictionary()
+
 
+def _chat_send_lock(chat_id: str) -> asyncio.Lock:
+    lock = _chat_send_locks.get(chat_id)
+    if lock is None:
+        lock = asyncio.Lock()
+        _chat_send_locks[chat_id] = lock
+    return lock
 
-async def _run_blocking(func: Any, /, *args: Any, **kwargs: Any) -> Any:
-    loop = asyncio.get_running_loop()
-    bound = functools.partial(func, *args, **kwargs)
-    return await loop.run_in_executor(_BLOCKING_POOL, bound)
+
+async def _safe_send(api: TelegramBotApi, chat_id: str, text: str) -> None:
+    # Chunks are posted in order so Telegram shows them in sequence. A failed
+    # chunk is logged and the rest are still sent, so one transient error does
+    # not drop the remainder of the reply. Concurrent sends to the same chat
+    # take turns so their chunks do not interleave.
+    async with _chat_send_lock(chat_id):
+        for chunk in split_telegram_text(text):
+            try:
+                await api.send_message_async(chat_id=chat_id, text=chunk)
+            except Exception as exc:
+                _log(f"[warn] failed to send telegram message: {exc}")
+
+
+async def _poll_updates(
+    api: TelegramBotApi,
+    *,
+    offset: int | None,
+    timeout: int,
+) -> list[dict[str, Any]]:
+    return await api.get_updates_async(offset=offset, timeout=timeout)
 
 
 def _next_offset_from_updates(updates: list[dict[str, Any]]) -> int | None:
-    latest_update_id: int | None = None
-    for update in updates:
+    # getUpdates returns updates in ascending update_id order, so the last
+    # valid id is the latest one.
+    for update in reversed(updates):
         update_id = update.get("update_id")
-        if not isinstance(update_id, int):
-            continue
-        if latest_update_id is None or update_id > latest_update_id:
-            latest_update_id = update_id
+        if isinstance(update_id, int):
+            return update_id + 1
+    return None
 
-    if latest_update_id is None:
-        return None
-    return latest_update_id + 1
+
+def _next_poll_timeout(updates: list[dict[str, Any]], poll_timeout: int) -> int:
+    # A full batch means more updates are likely queued on the server; drain
+    # them with short polls before going back to the long poll.
+    if len(updates) >= _GET_UPDATES_BATCH_LIMIT:
+        return 0
+    return poll_timeout
 
 
 def _render_progress_message(
@@ -434,12 +584,7 @@ def _render_progress_message(
 
 
 def _is_cancel_command(text: str | None) -> bool:
-    raw = (text or "").strip()
-    if not raw.startswith("/"):
-        return False
-
-    command = raw.split(maxsplit=1)[0].lower()
-    return command == "/cancel" or command.startswith("/cancel@")
+    return bool(text) and _CANCEL_COMMAND_RE.match(text) is not None
 
 
 def _format_inbound_stdout(*, chat_id: str, user_id: str, text: str) -> str:
@@ -468,7 +613,8 @@ class _AgentMessageDispatcher:
         self._chat_id = chat_id
         self._user_id = user_id
         self._loop = loop
-        self.pending_sends: set[asyncio.Task[None]] = set()
+        self._outbound: asyncio.Queue[str] = asyncio.Queue()
+        self._sender: asyncio.Task[None] | None = None
 
     def dispatch(self, text: str) -> None:
         outbound = _format_threaded_outbound_message(
@@ -476,34 +622,43 @@ class _AgentMessageDispatcher:
             user_id=self._user_id,
             text=text,
         )
-        _stdout_print(outbound, flush=True)
-        self._schedule(self._send(outbound))
-
-    def _schedule(self, coroutine: Coroutine[Any, Any, None]) -> None:
-        try:
-            running_loop = asyncio.get_running_loop()
-        except RuntimeError:
-            asyncio.run_coroutine_threadsafe(coroutine, self._loop)
-            return
-
-        if running_loop is self._loop:
-            task = self._loop.create_task(coroutine)
-            self.pending_sends.add(task)
-            task.add_done_callback(self.pending_sends.discard)
-            return
-
-        asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+        _log(outbound, flush=True)
+        # Callers may be worker threads; hand off to the loop and let a single
+        # sender task deliver messages in dispatch order.
+        self._loop.call_soon_threadsafe(self._enqueue, text)
+
+    def _enqueue(self, text: str) -> None:
+        self._outbound.put_nowait(text)
+        if self._sender is None or self._sender.done():
+            self._sender = self._loop.create_task(self._send_queued())
+
+    async def _send_queued(self) -> None:
+        while not self._outbound.empty():
+            # Notifications tend to arrive in bursts; wait briefly so a burst
+            # goes out as one threaded message instead of one request each.
+            await asyncio.sleep(_OUTBOUND_COALESCE_SEC)
+            batch = [self._outbound.get_nowait()]
+            while not self._outbound.empty():
+                batch.append(self._outbound.get_nowait())
+            await self._send(
+                _format_threaded_outbound_message(
+                    chat_id=self._chat_id,
+                    user_id=self._user_id,
+                    text="\n".join(batch),
+                )
+            )
 
     async def _send(self, text: str) -> None:
         try:
-            await _run_blocking(_safe_send, self._api, self._chat_id, text)
+            await _safe_send(self._api, self._chat_id, text)
         except Exception as exc:
-            _stdout_print(f"[warn] failed to forward agent message: {exc}")
+            _log(f"[warn] failed to forward agent message: {exc}")
 
     async def drain(self) -> None:
-        if not self.pending_sends:
-            return
-        await asyncio.gather(*list(self.pending_sends), return_exceptions=True)
+        # Let hand-offs already scheduled on the loop reach the queue first.
+        await asyncio.sleep(0)
+        if self._sender is not None:
+            await self._sender
 
 
 def _format_intermediate_notification_text(notification: AgentTextNotification) -> str:
@@ -546,7 +701,7 @@ async def _run_with_progress_notifications(
             outbound_text = _format_intermediate_notification_text(notification)
             dispatcher.dispatch(outbound_text)
         except Exception as exc:
-            _stdout_print(f"[warn] failed to forward codex notification: {exc}")
+            _log(f"[warn] failed to forward codex notification: {exc}")
 
     def _on_mode_selected(mode: str, reason: str) -> None:
         del reason
@@ -566,9 +721,6 @@ async def _run_with_progress_notifications(
             mcp_payload_texts.add(normalized)
         dispatcher.dispatch(line)
 
-    mode_select_token = _MODE_SELECT_CALLBACK.set(_on_mode_selected)
-    agent_transfer_token = _AGENT_TRANSFER_CALLBACK.set(_on_agent_transfer)
-
     executor = _extract_executor(orchestrator)
     previous_callback: Any | None = None
     previous_mcp_response_callback: Any | None = None
@@ -578,18 +730,26 @@ async def _run_with_progress_notifications(
         executor.on_agent_message = _forward_intermediate
         executor.on_mcp_response = _forward_mcp_response
 
+    # Requests run one at a time, so the workflow's callback attributes act as
+    # the active handler slot; concurrent requests would need per-task state.
+    plan_workflow = getattr(orchestrator, "plan_workflow", None)
+    previous_mode_selected: Any | None = None
+    previous_agent_transfer: Any | None = None
+    if plan_workflow is not None:
+        previous_mode_selected = plan_workflow.on_mode_selected
+        previous_agent_transfer = plan_workflow.on_agent_transfer
+        plan_workflow.on_mode_selected = _on_mode_selected
+        plan_workflow.on_agent_transfer = _on_agent_transfer
+
     try:
-        plan_workflow = getattr(orchestrator, "plan_workflow", None)
-        if plan_workflow is not None:
-            plan_workflow.on_mode_selected = _on_mode_selected
-            plan_workflow.on_agent_transfer = _on_agent_transfer
         output = await orchestrator.handle_message(chat_id, user_id, text)
         if output.strip() and output.strip() in mcp_payload_texts:
             final_answer_sent = True
         return output, final_answer_sent
     finally:
-        _MODE_SELECT_CALLBACK.reset(mode_select_token)
-        _AGENT_TRANSFER_CALLBACK.reset(agent_transfer_token)
+        if plan_workflow is not None:
+            plan_workflow.on_mode_selected = previous_mode_selected
+            plan_workflow.on_agent_transfer = previous_agent_transfer
         await dispatcher.drain()
         if isinstance(executor, OpenAIAgentsExecutor):
             executor.on_agent_message = previous_callback
@@ -626,12 +786,12 @@ async def _process_inbound_request(
         try:
             await _close_codex_mcp(orchestrator)
         except Exception as exc:
-            _stdout_print(f"[warn] failed to close codex mcp session after request: {exc}")
+            _log(f"[warn] failed to close codex mcp session after request: {exc}")
 
     if not final_answer_sent:
         outbound = _format_threaded_outbound_message(chat_id=chat_id, user_id=user_id, text=output)
-        _stdout_print(outbound, flush=True)
-        await _run_blocking(_safe_send, api, chat_id, outbound)
+        _log(outbound, flush=True)
+        await _safe_send(api, chat_id, outbound)
 
 
 async def _cancel_inflight_request(
@@ -648,7 +808,7 @@ async def _cancel_inflight_request(
         except asyncio.CancelledError:
             pass
         except Exception as exc:
-            _stdout_print(f"[warn] request task finished with error before cancel: {exc}")
+            _log(f"[warn] request task finished with error before cancel: {exc}")
         return False
 
     request_task.cancel()
@@ -657,7 +817,7 @@ async def _cancel_inflight_request(
     except asyncio.CancelledError:
         pass
     except Exception as exc:
-        _stdout_print(f"[warn] request task failed while cancelling: {exc}")
+        _log(f"[warn] request task failed while cancelling: {exc}")
     return True
 
 
@@ -669,24 +829,19 @@ async def _wait_for_request_completion(
     if request_task is None:
         return True
 
-    if request_task.done():
-        try:
-            request_task.result()
-        except asyncio.CancelledError:
-            pass
-        except Exception as exc:
-            _stdout_print(f"[warn] request task failed after cancel: {exc}")
-        return True
-
+    # shield() keeps the timeout from cancelling the request itself; wait_for
+    # wakes once on completion or on its timer, and returns at once if done.
     try:
         await asyncio.wait_for(asyncio.shield(request_task), timeout=timeout_sec)
         return True
     except asyncio.TimeoutError:
         return False
     except asyncio.CancelledError:
-        return True
+        if request_task.cancelled():
+            return True
+        raise
     except Exception as exc:
-        _stdout_print(f"[warn] request task failed after cancel: {exc}")
+        _log(f"[warn] request task failed after cancel: {exc}")
         return True
 
 
@@ -713,23 +868,23 @@ def _format_mcp_status(status: dict[str, Any]) -> str:
 async def _warmup_codex_mcp(orchestrator: Any) -> bool:
     executor = _extract_executor(orchestrator)
     if isinstance(executor, EchoCodexExecutor):
-        _stdout_print("[warn] codex.allow_echo_executor=true (debug mode). mcp warmup is skipped.")
+        _log("[warn] codex.allow_echo_executor=true (debug mode). mcp warmup is skipped.")
         return False
 
     if not isinstance(executor, OpenAIAgentsExecutor):
-        _stdout_print(f"[warn] unknown executor type: {type(executor).__name__}; skip mcp warmup")
+        _log(f"[warn] unknown executor type: {type(executor).__name__}; skip mcp warmup")
         return False
 
     try:
         await executor.warmup()
         status = orchestrator.codex_mcp.get_status()
-        _stdout_print(f"[info] codex mcp-server connected: {_format_mcp_status(status)}")
+        _log(f"[info] codex mcp-server connected: {_format_mcp_status(status)}")
         # Keep request task affinity stable by not retaining an opened MCP session
         # from startup task. Each inbound request opens/closes its own session.
         await executor.close()
         return True
     except Exception as exc:
-        _stdout_print(f"[error] codex mcp-server connection failed: {exc}")
+        _log(f"[error] codex mcp-server connection failed: {exc}")
         return False
 
 
@@ -741,7 +896,206 @@ async def _close_codex_mcp(orchestrator: Any) -> None:
     try:
         await executor.close()
     except Exception as exc:
-        _stdout_print(f"[warn] failed to close codex mcp session: {exc}")
+        _log(f"[warn] failed to close codex mcp session: {exc}")
+
+
+async def _flush_orchestrator_traces(orchestrator: Any) -> None:
+    flush_traces = getattr(orchestrator, "flush_traces", None)
+    if flush_traces is None:
+        return
+
+    try:
+        await flush_traces()
+    except Exception as exc:
+        _log(f"[warn] failed to flush traces: {exc}")
+
+
+async def _fetch_inbound_updates(
+    api: TelegramBotApi,
+    inbound_queue: asyncio.Queue[TelegramInboundMessage],
+    *,
+    offset: int | None,
+    poll_timeout: int,
+    error_backoff_sec: float,
+) -> None:
+    next_offset = offset
+    poll_wait = poll_timeout
+    backoff_sec = error_backoff_sec
+    while True:
+        try:
+            updates = await _poll_updates(api, offset=next_offset, timeout=poll_wait)
+        except Exception as exc:
+            _log(f"[warn] polling loop error: {exc}")
+            poll_wait = poll_timeout
+            # Back off exponentially with jitter while Telegram keeps failing.
+            delay_sec = min(backoff_sec, _POLL_ERROR_BACKOFF_MAX_SEC)
+            await asyncio.sleep(random.uniform(delay_sec / 2, delay_sec))
+            backoff_sec = min(backoff_sec * 2, _POLL_ERROR_BACKOFF_MAX_SEC)
+            continue
+
+        backoff_sec = error_backoff_sec
+        try:
+            poll_wait = _next_poll_timeout(updates, poll_timeout)
+            batch_offset = _next_offset_from_updates(updates)
+        except Exception as exc:
+            _log(f"[warn] failed to read telegram update batch: {exc}")
+            poll_wait = poll_timeout
+            continue
+        if batch_offset is not None:
+            next_offset = batch_offset
+        # The offset already covers the whole batch, so a malformed update is
+        # logged and skipped instead of being fetched again.
+        for update in updates:
+            try:
+                inbound = parse_update(update)
+            except Exception as exc:
+                _log(f"[warn] failed to parse telegram update: {exc}")
+                continue
+            if inbound:
+                await inbound_queue.put(inbound)
+
+
+async def _next_inbound(
+    inbound_queue: asyncio.Queue[TelegramInboundMessage],
+    fetch_task: asyncio.Task[None],
+) -> TelegramInboundMessage:
+    if not inbound_queue.empty():
+        return inbound_queue.get_nowait()
+    # Wait on the fetcher too, so a crashed fetcher stops the runner with an
+    # error instead of leaving it blocked on an empty queue.
+    get_task = asyncio.ensure_future(inbound_queue.get())
+    try:
+        await asyncio.wait({fetch_task, get_task}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        if not get_task.done():
+            get_task.cancel()
+    if get_task.done() and not get_task.cancelled():
+        return get_task.result()
+    exc = fetch_task.exception() if not fetch_task.cancelled() else None
+    _log(f"[error] telegram update fetcher stopped: {exc!r}", flush=True)
+    raise RuntimeError("telegram update fetcher stopped") from exc
+
+
+class _ChatRequestQueues:
+    """Per-chat FIFO backlog of requests, drained by one worker task per chat."""
+
+    def __init__(
+        self,
+        *,
+        run_request: Callable[[TelegramInboundMessage], Awaitable[None]],
+        max_backlog: int,
+    ) -> None:
+        self._run_request = run_request
+        self._max_backlog = max_backlog
+        self._queues: dict[str, asyncio.Queue[TelegramInboundMessage]] = {}
+        self._workers: dict[str, asyncio.Task[None]] = {}
+        # Executor and workflow callbacks are shared, so only one request runs
+        # at a time even though each chat has its own backlog.
+        self._run_lock = asyncio.Lock()
+        self.active_task: asyncio.Task[None] | None = None
+        self.active_chat_id: str | None = None
+        self._pending = 0
+
+    def is_busy(self) -> bool:
+        return self._pending > 0
+
+    def active_task_for(self, chat_id: str) -> asyncio.Task[None] | None:
+        if self.active_chat_id != chat_id:
+            return None
+        return self.active_task
+
+    def drop_backlog(self, chat_id: str) -> int:
+        backlog = self._queues.get(chat_id)
+        if backlog is None:
+            return 0
+        dropped = 0
+        while not backlog.empty():
+            backlog.get_nowait()
+            dropped += 1
+        self._pending -= dropped
+        return dropped
+
+    def submit(self, inbound: TelegramInboundMessage) -> bool:
+        backlog = self._queues.get(inbound.chat_id)
+        if backlog is None:
+            backlog = asyncio.Queue(maxsize=self._max_backlog)
+            self._queues[inbound.chat_id] = backlog
+            self._workers[inbound.chat_id] = asyncio.create_task(
+                self._drain_chat(inbound.chat_id, backlog)
+            )
+        try:
+            backlog.put_nowait(inbound)
+        except asyncio.QueueFull:
+            return False
+        self._pending += 1
+        return True
+
+    async def _drain_chat(
+        self,
+        chat_id: str,
+        backlog: asyncio.Queue[TelegramInboundMessage],
+    ) -> None:
+        while True:
+            # Take the next request only once the lock is held, so a backlog
+            # dropped by /cancel never leaves a request waiting to run.
+            async with self._run_lock:
+                if backlog.empty():
+                    break
+                inbound = backlog.get_nowait()
+                request_task = asyncio.create_task(self._run_request(inbound))
+                self.active_task = request_task
+                self.active_chat_id = chat_id
+                try:
+                    await asyncio.wait((request_task,))
+                finally:
+                    self.active_task = None
+                    self.active_chat_id = None
+                    self._pending -= 1
+            try:
+                request_task.result()
+            except asyncio.CancelledError:
+                pass
+            except Exception as exc:
+                _log(f"[warn] request task failed: {exc}")
+        del self._queues[chat_id]
+        del self._workers[chat_id]
+
+    async def close(self) -> None:
+        workers = list(self._workers.values())
+        for worker in workers:
+            worker.cancel()
+        active_task = self.active_task
+        if active_task is not None and not active_task.done():
+            active_task.cancel()
+            workers.append(active_task)
+        for result in await asyncio.gather(*workers, return_exceptions=True):
+            if isinstance(result, Exception):
+                _log(f"[warn] request task failed during shutdown: {result}")
+
+
+class _GracefulShutdown:
+    """Turns SIGINT/SIGTERM into one cancellation of the polling task."""
+
+    def __init__(self, task: asyncio.Task[Any] | None) -> None:
+        self._task = task
+        self.requested = False
+
+    def install(self, loop: asyncio.AbstractEventLoop) -> None:
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, self._request)
+            except (NotImplementedError, RuntimeError):
+                # Not supported on Windows or off the main thread; Ctrl-C then
+                # surfaces as KeyboardInterrupt in main() as before.
+                return
+
+    def _request(self) -> None:
+        # Ignore repeated signals so MCP cleanup in the finally block runs once
+        # without being cancelled again.
+        if self.requested or self._task is None:
+            return
+        self.requested = True
+        self._task.cancel()
 
 
 async def _run_polling(*, verbose: bool = False) -> None:
@@ -772,38 +1126,58 @@ async def _run_polling(*, verbose: bool = False) -> None:
     progress_message_template = "still working... elapsed={elapsed_sec}s"
 
     api = TelegramBotApi(token=token)
-    _stdout_print(f"[info] conf file: {conf_file}")
+    _log(f"[info] conf file: {conf_file}")
     if allowed_users is not None:
-        _stdout_print(f"[info] telegram user allowlist enabled: count={len(allowed_users)}")
+        _log(f"[info] telegram user allowlist enabled: count={len(allowed_users)}")
     else:
-        _stdout_print("[info] telegram user allowlist disabled (telegram.allowed_users not set)")
+        _log("[info] telegram user allowlist disabled (telegram.allowed_users not set)")
 
     if clear_webhook:
         try:
-            await _run_blocking(api.delete_webhook, drop_pending_updates=drop_pending)
+            await api.delete_webhook(drop_pending_updates=drop_pending)
         except Exception as exc:
-            _stdout_print(f"[warn] failed to delete webhook on startup: {exc}")
+            _log(f"[warn] failed to delete webhook on startup: {exc}")
 
     orchestrator = build_orchestrator()
     if verbose:
         executor = _extract_executor(orchestrator)
         if isinstance(executor, OpenAIAgentsExecutor):
             executor.verbose_stdout = True
-            _stdout_print("[info] verbose mode enabled: codex events will be printed to stdout")
-    active_request_task: asyncio.Task[None] | None = None
+            _log("[info] verbose mode enabled: codex events will be printed to stdout")
+
+    async def _run_request(inbound: TelegramInboundMessage) -> None:
+        await _process_inbound_request(
+            orchestrator=orchestrator,
+            api=api,
+            chat_id=inbound.chat_id,
+            user_id=inbound.user_id,
+            text=inbound.text,
+            progress_notify=progress_notify,
+            progress_initial_delay_sec=progress_initial_delay_sec,
+            progress_interval_sec=progress_interval_sec,
+            progress_message_template=progress_message_template,
+        )
+
+    request_queues = _ChatRequestQueues(
+        run_request=_run_request,
+        max_backlog=_CHAT_BACKLOG_MAXSIZE,
+    )
+    fetch_task: asyncio.Task[None] | None = None
+    shutdown = _GracefulShutdown(asyncio.current_task())
+    shutdown.install(asyncio.get_running_loop())
     try:
         next_offset: int | None = None
         if ignore_pending_updates_on_start:
             try:
-                pending_updates = await _run_blocking(api.get_updates, offset=None, timeout=0)
+                pending_updates = await _poll_updates(api, offset=None, timeout=0)
                 next_offset = _next_offset_from_updates(pending_updates)
                 if next_offset is not None:
-                    _stdout_print(
+                    _log(
                         "[info] skipped pending telegram updates on startup: "
                         f"count={len(pending_updates)}, next_offset={next_offset}"
                     )
             except Exception as exc:
-                _stdout_print(f"[warn] failed to skip pending telegram updates on startup: {exc}")
+                _log(f"[warn] failed to skip pending telegram updates on startup: {exc}")
 
         warmup_ok = await _warmup_codex_mcp(orchestrator)
         if require_mcp_warmup and not warmup_ok:
@@ -813,133 +1187,127 @@ async def _run_polling(*, verbose: bool = False) -> None:
                 "or disable strict check with [telegram.polling].require_mcp_warmup=false"
             )
 
-        _stdout_print("[info] telegram polling runner started")
+        _log("[info] telegram polling runner started")
+        inbound_queue: asyncio.Queue[TelegramInboundMessage] = asyncio.Queue(
+            maxsize=_INBOUND_QUEUE_MAXSIZE
+        )
+        fetch_task = asyncio.create_task(
+            _fetch_inbound_updates(
+                api,
+                inbound_queue,
+                offset=next_offset,
+                poll_timeout=poll_timeout,
+                error_backoff_sec=loop_sleep_sec,
+            )
+        )
         while True:
-            if active_request_task is not None and active_request_task.done():
-                try:
-                    active_request_task.result()
-                except asyncio.CancelledError:
-                    pass
-                except Exception as exc:
-                    _stdout_print(f"[warn] request task failed: {exc}")
-                active_request_task = None
-
+            inbound = await _next_inbound(inbound_queue, fetch_task)
             try:
-                updates = await _run_blocking(
-                    api.get_updates,
-                    offset=next_offset,
-                    timeout=poll_timeout,
+                _log(
+                    _format_inbound_stdout(
+                        chat_id=inbound.chat_id,
+                        user_id=inbound.user_id,
+                        text=inbound.text,
+                    ),
+                    flush=True,
                 )
-                for update in updates:
-                    update_id = update.get("update_id")
-                    if isinstance(update_id, int):
-                        next_offset = update_id + 1
-
-                    inbound = parse_update(update)
-                    if not inbound:
-                        continue
-
-                    _stdout_print(
-                        _format_inbound_stdout(
-                            chat_id=inbound.chat_id,
-                            user_id=inbound.user_id,
-                            text=inbound.text,
-                        ),
-                        flush=True,
+
+                if (
+                    allowed_users is not None
+                    and _allowlist_key(inbound.user_id) not in allowed_users
+                ):
+                    await _safe_send(
+                        api,
+                        inbound.chat_id,
+                        _UNAUTHORIZED_MESSAGE,
                     )
+                    continue
 
-                    if allowed_users is not None and inbound.user_id not in allowed_users:
-                        await _run_blocking(
-                            _safe_send,
-                            api,
+                if _is_cancel_command(inbound.text):
+                    try:
+                        output = await orchestrator.handle_message(
                             inbound.chat_id,
-                            _UNAUTHORIZED_MESSAGE,
+                            inbound.user_id,
+                            "/cancel",
                         )
-                        continue
-
-                    if _is_cancel_command(inbound.text):
-                        try:
-                            output = await orchestrator.handle_message(
-                                inbound.chat_id,
-                                inbound.user_id,
-                                "/cancel",
+                    except Exception as exc:
+                        output = f"internal error: {exc}"
+
+                    dropped = request_queues.drop_backlog(inbound.chat_id)
+                    if dropped:
+                        _log(f"[info] dropped {dropped} queued request(s) for chat {inbound.chat_id}")
+                    active_request_task = request_queues.active_task_for(inbound.chat_id)
+                    nothing_running = output.strip().lower() == "no running task to cancel."
+                    if active_request_task is not None:
+                        # Primary cancel path is routed through orchestrator.
+                        # Fallback to direct task cancel only when orchestrator
+                        # reports no running task but one is still active here.
+                        if nothing_running:
+                            await _cancel_inflight_request(
+                                orchestrator=orchestrator,
+                                request_task=active_request_task,
                             )
-                        except Exception as exc:
-                            output = f"internal error: {exc}"
-
-                        if active_request_task is not None:
-                            normalized_output = output.strip().lower()
-                            # Primary cancel path is routed through orchestrator.
-                            # Fallback to direct task cancel only when orchestrator
-                            # reports no running task but one is still active here.
-                            if normalized_output == "no running task to cancel.":
-                                await _cancel_inflight_request(
-                                    orchestrator=orchestrator,
-                                    request_task=active_request_task,
-                                )
-                            else:
-                                completed = await _wait_for_request_completion(
-                                    request_task=active_request_task,
-                                    timeout_sec=cancel_wait_timeout_sec,
+                        else:
+                            completed = await _wait_for_request_completion(
+                                request_task=active_request_task,
+                                timeout_sec=cancel_wait_timeout_sec,
+                            )
+                            if not completed:
+                                _log(
+                                    "[warn] cancel acknowledged but request is still shutting down"
                                 )
-                                if not completed:
-                                    _stdout_print(
-                                        "[warn] cancel acknowledged but request is still shutting down"
-                                    )
-                            if active_request_task.done():
-                                active_request_task = None
-
-                        await _run_blocking(_safe_send, api, inbound.chat_id, output)
-                        continue
-
-                    if active_request_task is not None and not active_request_task.done():
-                        await _run_blocking(
-                            _safe_send,
-                            api,
-                            inbound.chat_id,
-                            "A task is already running for this session. Please try again shortly.",
-                        )
-                        continue
-
-                    active_request_task = asyncio.create_task(
-                        _process_inbound_request(
-                            orchestrator=orchestrator,
-                            api=api,
-                            chat_id=inbound.chat_id,
-                            user_id=inbound.user_id,
-                            text=inbound.text,
-                            progress_notify=progress_notify,
-                            progress_initial_delay_sec=progress_initial_delay_sec,
-                            progress_interval_sec=progress_interval_sec,
-                            progress_message_template=progress_message_template,
-                        )
+
+                    if dropped:
+                        dropped_notice = f"Dropped {dropped} queued request(s)."
+                        if nothing_running and active_request_task is None:
+                            output = dropped_notice
+                        else:
+                            output = f"{output}\n{dropped_notice}"
+                    await _safe_send(api, inbound.chat_id, output)
+                    continue
+
+                busy = request_queues.is_busy()
+                if not request_queues.submit(inbound):
+                    await _safe_send(
+                        api,
+                        inbound.chat_id,
+                        "Too many requests are waiting for this session. Please try again shortly.",
+                    )
+                elif busy:
+                    await _safe_send(
+                        api,
+                        inbound.chat_id,
+                        "A task is already running. Your request has been queued.",
                     )
             except Exception as exc:
-                _stdout_print(f"[warn] polling loop error: {exc}")
-
-            if loop_sleep_sec > 0:
-                await asyncio.sleep(loop_sleep_sec)
+                _log(f"[warn] failed to handle telegram update: {exc}")
+    except asyncio.CancelledError:
+        if not shutdown.requested:
+            raise
+        _log("[info] stopped by signal; shutting down")
     finally:
-        if active_request_task is not None and not active_request_task.done():
-            active_request_task.cancel()
-            try:
-                await active_request_task
-            except asyncio.CancelledError:
-                pass
-            except Exception:
-                pass
+        if fetch_task is not None:
+            fetch_task.cancel()
+            await asyncio.gather(fetch_task, return_exceptions=True)
+        await request_queues.close()
+        await _flush_orchestrator_traces(orchestrator)
         await _close_codex_mcp(orchestrator)
+        await api.aclose()
 
 
 def _parse_args() -> tuple[str | None, bool]:
-    conf_path = None
-    verbose = False
-    for i, arg in enumerate(sys.argv[1:]):
-        if arg == "--version":
-            _stdout_print(f"[info] codex-orchestrator {_VERSION}")
-            sys.exit(0)
-        if arg == "--help" or arg == "-h":
-            _stdout_print(f"""[info] codex-orchestrator {_VERSION}
+    parser = argparse.ArgumentParser(add_help=False, allow_abbrev=False)
+    parser.add_argument("--conf")
+    parser.add_argument("--verbose", action="store_true")
+    parser.add_argument("--version", action="store_true")
+    parser.add_argument("-h", "--help", action="store_true")
+    # Unknown arguments were always ignored; keep tolerating them.
+    args, _ = parser.parse_known_args(sys.argv[1:])
+    if args.version:
+        _log(f"[info] codex-orchestrator {_VERSION}")
+        sys.exit(0)
+    if args.help:
+        _log(f"""[info] codex-orchestrator {_VERSION}
 
 Usage: codex-orchestrator [OPTIONS]
 
@@ -950,12 +1318,8 @@ Options:
   --help, -h     Show this help
 
 For more info: https://github.com/heungtae/codex-orchestrator""")
-            sys.exit(0)
-        if arg == "--conf" and i + 2 < len(sys.argv):
-            conf_path = sys.argv[i + 2]
-        if arg == "--verbose":
-            verbose = True
-    return conf_path, verbose
+        sys.exit(0)
+    return args.conf, args.verbose
 
 
 def main() -> None:
@@ -964,10 +1328,13 @@ def main() -> None:
         os.environ["CODEX_CONF_PATH"] = conf_path
     os.environ["CODEX_ORCHESTRATOR_VERSION"] = _VERSION
     _configure_logging()
+    run = asyncio.run if uvloop is None else uvloop.run
     try:
-        asyncio.run(_run_polling(verbose=verbose))
+        run(_run_polling(verbose=verbose))
     except KeyboardInterrupt:
-        _stdout_print("\n[info] stopped by user")
+        _log("\n[info] stopped by user")
+    finally:
+        _stop_logging()
 
 
 if __name__ == "__main__":
@@ -5,7 +5,7 @@ from dataclasses import dataclass
 TELEGRAM_MAX_MESSAGE_LEN = 4096
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class TelegramInboundMessage:
     chat_id: str
     user_id: str
@@ -36,17 +36,22 @@ def split_telegram_text(text: str, max_chars: int = TELEGRAM_MAX_MESSAGE_LEN) ->
     if len(text) <= max_chars:
         return [text]
 
+    # Walk the text by index so each chunk is sliced once instead of copying
+    # the whole remaining tail on every step.
     chunks: list[str] = []
-    remaining = text
-
-    while len(remaining) > max_chars:
-        split_at = remaining.rfind("\n", 0, max_chars)
-        if split_at <= 0:
-            split_at = max_chars
-        chunks.append(remaining[:split_at])
-        remaining = remaining[split_at:].lstrip("\n")
-
-    if remaining:
-        chunks.append(remaining)
+    start = 0
+    end = len(text)
+
+    while end - start > max_chars:
+        split_at = text.rfind("\n", start, start + max_chars)
+        if split_at <= start:
+            split_at = start + max_chars
+        chunks.append(text[start:split_at])
+        start = split_at
+        while start < end and text[start] == "\n":
+            start += 1
+
+    if start < end:
+        chunks.append(text[start:])
 
     return chunks
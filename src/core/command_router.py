@@ -1,6 +1,22 @@
 from __future__ import annotations
 
-from core.models import RouteResult
+import re
+from typing import Callable
+
+from core.models import BotCommandName, RouteResult
+
+# Command token -> (command name, normalizer for its first argument, or None
+# for commands that take no argument).
+_BOT_COMMANDS: dict[str, tuple[BotCommandName, Callable[[str], str] | None]] = {
+    "/start": ("start", None),
+    "/new": ("new", None),
+    "/status": ("status", None),
+    "/mode": ("mode", str.lower),
+    "/profile": ("profile", str.strip),
+    "/cancel": ("cancel", None),
+}
+_FIRST_TOKEN_RE = re.compile(r"\S+")
+_EMPTY_ROUTE = RouteResult(kind="text", text="")
 
 
 class CommandRouter:
@@ -9,49 +25,30 @@ class CommandRouter:
     def route(self, text: str | None) -> RouteResult:
         raw = (text or "").strip()
         if not raw:
-            return RouteResult(kind="text", text="")
+            return _EMPTY_ROUTE
 
+        # Only the first token decides the route; the rest of the message is
+        # split (at most twice) only when a command needs its argument.
+        head = _FIRST_TOKEN_RE.match(raw).group()
         if raw.startswith("/"):
-            parts = raw.split()
-            command_token = parts[0].lower()
-            command = command_token.split("@", 1)[0]
-
-            if command == "/start":
-                return RouteResult(kind="bot_command", text=raw, command="start")
-
-            if command == "/new":
-                return RouteResult(kind="bot_command", text=raw, command="new")
-
-            if command == "/status":
-                return RouteResult(kind="bot_command", text=raw, command="status")
-
-            if command == "/mode":
-                mode_arg = parts[1].lower() if len(parts) > 1 else ""
-                return RouteResult(
-                    kind="bot_command",
-                    text=raw,
-                    command="mode",
-                    args=(mode_arg,),
-                )
-
-            if command == "/profile":
-                profile_arg = parts[1].strip() if len(parts) > 1 else ""
-                return RouteResult(
-                    kind="bot_command",
-                    text=raw,
-                    command="profile",
-                    args=(profile_arg,),
-                )
-
-            if command == "/cancel":
-                return RouteResult(kind="bot_command", text=raw, command="cancel")
-
-            return RouteResult(kind="codex_slash", text=raw)
-
-        parts = raw.split()
-        if parts:
-            command = parts[0].lower()
-            if command == "profile" and len(parts) <= 2:
+            # Group chats append "@botname"; lowercase only the command part.
+            at = head.find("@")
+            command = (head if at < 0 else head[:at]).lower()
+
+            spec = _BOT_COMMANDS.get(command)
+            if spec is None:
+                return RouteResult(kind="codex_slash", text=raw)
+
+            name, normalize_arg = spec
+            if normalize_arg is None:
+                return RouteResult(kind="bot_command", text=raw, command=name)
+            parts = raw.split(None, 2)
+            arg = normalize_arg(parts[1]) if len(parts) > 1 else ""
+            return RouteResult(kind="bot_command", text=raw, command=name, args=(arg,))
+
+        if head.lower() == "profile":
+            parts = raw.split(None, 2)
+            if len(parts) <= 2:
                 profile_arg = parts[1].strip() if len(parts) > 1 else ""
                 return RouteResult(
                     kind="bot_command",
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
+import time
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Any, Literal, TypedDict
+from typing import Any, Callable, Literal, TypedDict
 
 BotMode = Literal["single", "plan"]
 InputKind = Literal["bot_command", "codex_slash", "text"]
@@ -10,12 +11,37 @@ BotCommandName = Literal["start", "mode", "new", "status", "profile", "cancel"]
 ReviewResult = Literal["approved", "needs_changes", "max_rounds_reached"]
 RunStatus = Literal["idle", "ok", "error"]
 
+_BOT_MODES: frozenset[str] = frozenset(("single", "plan"))
+_RUN_STATUSES: frozenset[str] = frozenset(("idle", "ok", "error"))
+_REVIEW_RESULTS: frozenset[str] = frozenset(("approved", "needs_changes", "max_rounds_reached"))
 
-def utc_now_iso() -> str:
-    return datetime.now(timezone.utc).isoformat(timespec="seconds")
 
+def _per_second(format_time: Callable[[int], str]) -> Callable[[], str]:
+    # Second resolution, so bursts of calls reuse the last formatted string.
+    cache: tuple[int, str] = (-1, "")
 
-@dataclass(frozen=True)
+    def current() -> str:
+        nonlocal cache
+        now = int(time.time())
+        cached_sec, cached_text = cache
+        if now != cached_sec:
+            cached_text = format_time(now)
+            cache = (now, cached_text)
+        return cached_text
+
+    return current
+
+
+utc_now_iso = _per_second(
+    lambda now: datetime.fromtimestamp(now, timezone.utc).isoformat(timespec="seconds")
+)
+# Local wall-clock time used to prefix stdout log lines.
+local_timestamp = _per_second(
+    lambda now: time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now))
+)
+
+
+@dataclass(frozen=True, slots=True)
 class RouteResult:
     kind: InputKind
     text: str
@@ -23,7 +49,7 @@ class RouteResult:
     args: tuple[str, ...] = ()
 
 
-@dataclass
+@dataclass(slots=True)
 class BotSession:
     session_id: str
     chat_id: str
@@ -70,15 +96,15 @@ class BotSession:
     @classmethod
     def from_dict(cls, payload: dict[str, Any]) -> "BotSession":
         mode = payload.get("mode", "plan")
-        if mode not in ("single", "plan"):
+        if not isinstance(mode, str) or mode not in _BOT_MODES:
             mode = "plan"
 
         last_run_status = payload.get("last_run_status", "idle")
-        if last_run_status not in ("idle", "ok", "error"):
+        if not isinstance(last_run_status, str) or last_run_status not in _RUN_STATUSES:
             last_run_status = "idle"
 
         last_review_result = payload.get("last_review_result")
-        if last_review_result not in ("approved", "needs_changes", "max_rounds_reached", None):
+        if not isinstance(last_review_result, str) or last_review_result not in _REVIEW_RESULTS:
             last_review_result = None
 
         history = payload.get("history", [])
@@ -112,7 +138,7 @@ class BotSession:
             profile_working_directory=profile_working_directory,
             profile_agent_models=profile_agent_models,
             profile_agent_system_prompts=profile_agent_system_prompts,
-            updated_at=str(payload.get("updated_at", utc_now_iso())),
+            updated_at=str(payload["updated_at"]) if "updated_at" in payload else utc_now_iso(),
         )
 
 
@@ -120,18 +146,13 @@ def _parse_string_map(value: Any) -> dict[str, str]:
     if not isinstance(value, dict):
         return {}
 
-    parsed: dict[str, str] = {}
-    for raw_key, raw_val in value.items():
-        key = str(raw_key).strip().lower()
-        if not key:
-            continue
-        if raw_val is None:
-            continue
-        cleaned = str(raw_val).strip()
-        if not cleaned:
-            continue
-        parsed[key] = cleaned
-    return parsed
+    return {
+        key: cleaned
+        for raw_key, raw_val in value.items()
+        if raw_val is not None
+        and (key := str(raw_key).strip().lower())
+        and (cleaned := str(raw_val).strip())
+    }
 
 
 class WorkflowResult(TypedDict, total=False):
@@ -2,14 +2,16 @@ from __future__ import annotations
 
 import asyncio
 import os
+import threading
 import time
 import uuid
+from collections import deque
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
 from core.command_router import CommandRouter
-from core.models import BotMode, BotSession, RouteResult
+from core.models import BotMode, BotSession, RouteResult, utc_now_iso
 from core.profiles import ExecutionProfile, ProfileRegistry
 from core.session_manager import SessionManager
 from core.trace_logger import TraceLogger
@@ -17,6 +19,10 @@ from integrations.codex_executor import CodexExecutionError
 from integrations.codex_mcp import CodexMcpServer, CodexMcpStatusError
 from workflows.types import Workflow
 
+# Traces are written off the request path; when the writer falls behind, the
+# oldest pending records are dropped.
+_TRACE_BUFFER_MAXLEN = 1024
+
 
 @dataclass
 class BotOrchestrator:
@@ -28,11 +34,25 @@ class BotOrchestrator:
     codex_mcp: CodexMcpServer
     working_directory: str | None = None
     profile_registry: ProfileRegistry = field(default_factory=ProfileRegistry.build_default)
+    trace_enabled: bool = True
     _running_tasks: dict[str, asyncio.Task[Any]] = field(default_factory=dict, init=False, repr=False)
     _running_tasks_lock: asyncio.Lock = field(default_factory=asyncio.Lock, init=False, repr=False)
+    _trace_buffer: deque[dict[str, Any]] = field(
+        default_factory=lambda: deque(maxlen=_TRACE_BUFFER_MAXLEN),
+        init=False,
+        repr=False,
+    )
+    _trace_flusher: asyncio.Task[None] | None = field(default=None, init=False, repr=False)
+    # A flusher cancelled mid-batch keeps writing on its worker thread while
+    # the leftover buffer is drained, so trace file writes take turns.
+    _trace_write_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    _resolved_working_directory: tuple[str | None, str] | None = field(
+        default=None,
+        init=False,
+        repr=False,
+    )
 
     async def handle_message(self, chat_id: str | int, user_id: str | int, text: str | None) -> str:
-        run_id = str(uuid.uuid4())
         started = time.monotonic()
         route = self.router.route(text)
 
@@ -77,22 +97,23 @@ class BotOrchestrator:
             error_message = str(exc)
             await self._mark_error(chat_id=chat_id, user_id=user_id, error_message=error_message)
 
-        latency_ms = int((time.monotonic() - started) * 1000)
-        self._safe_trace(
-            {
-                "run_id": run_id,
-                "session_id": SessionManager.session_id(chat_id=chat_id, user_id=user_id),
-                "mode": trace_mode,
-                "review_round": review_round,
-                "review_result": review_result,
-                "input_kind": route.kind,
-                "input_text": route.text,
-                "output_text": output_text,
-                "status": "error" if error_message else "ok",
-                "latency_ms": latency_ms,
-                "error_message": error_message,
-            }
-        )
+        if self.trace_enabled:
+            latency_ms = int((time.monotonic() - started) * 1000)
+            self._safe_trace(
+                {
+                    "run_id": str(uuid.uuid4()),
+                    "session_id": SessionManager.session_id(chat_id=chat_id, user_id=user_id),
+                    "mode": trace_mode,
+                    "review_round": review_round,
+                    "review_result": review_result,
+                    "input_kind": route.kind,
+                    "input_text": route.text,
+                    "output_text": output_text,
+                    "status": "error" if error_message else "ok",
+                    "latency_ms": latency_ms,
+                    "error_message": error_message,
+                }
+            )
 
         return output_text
 
@@ -127,7 +148,7 @@ class BotOrchestrator:
                 self._help_text(
                     version=os.environ.get("CODEX_ORCHESTRATOR_VERSION", "unknown"),
                     mode=current_mode,
-                    working_directory=self._resolve_working_directory(self.working_directory)
+                    working_directory=self._current_working_directory(),
                 ),
                 "single",
             )
@@ -312,10 +333,47 @@ class BotOrchestrator:
             await self.session_manager.save(session)
 
     def _safe_trace(self, payload: dict[str, Any]) -> None:
-        try:
-            self.trace_logger.append(payload)
-        except Exception:
-            pass
+        payload.setdefault("timestamp", utc_now_iso())
+        self._trace_buffer.append(payload)
+        if self._trace_flusher is None or self._trace_flusher.done():
+            self._trace_flusher = asyncio.get_running_loop().create_task(self._flush_trace_buffer())
+            self._trace_flusher.add_done_callback(self._write_unflushed_traces)
+
+    async def _flush_trace_buffer(self) -> None:
+        # Records queued while a batch is being written go out in the next one.
+        while self._trace_buffer:
+            batch = list(self._trace_buffer)
+            self._trace_buffer.clear()
+            await asyncio.to_thread(self._write_traces, batch)
+
+    def _write_traces(self, batch: list[dict[str, Any]]) -> None:
+        with self._trace_write_lock:
+            try:
+                self.trace_logger.append_batch(batch)
+            except Exception:
+                pass
+
+    def _drain_trace_buffer(self) -> None:
+        if not self._trace_buffer:
+            return
+        batch = list(self._trace_buffer)
+        self._trace_buffer.clear()
+        self._write_traces(batch)
+
+    def _write_unflushed_traces(self, flusher: asyncio.Task[None]) -> None:
+        # Loop teardown (e.g. asyncio.run returning) cancels a pending flusher;
+        # write whatever it left behind synchronously so no record is lost.
+        if flusher.cancelled():
+            self._drain_trace_buffer()
+
+    async def flush_traces(self) -> None:
+        # Waits for buffered traces to reach disk; long-running callers should
+        # await this before shutting down. A flusher left over from a torn-down
+        # loop is already finished, so only a live one is awaited.
+        flusher = self._trace_flusher
+        if flusher is not None and not flusher.done():
+            await flusher
+        self._drain_trace_buffer()
 
     async def _set_running_task(self, *, session_id: str, task: asyncio.Task[Any]) -> None:
         async with self._running_tasks_lock:
@@ -363,6 +421,20 @@ class BotOrchestrator:
             ]
         )
 
+    def _current_working_directory(self) -> str:
+        # Path.resolve() walks the filesystem; reuse the result until the
+        # configured directory changes. Without one the process cwd is used,
+        # which can change at any time, so that case is not cached.
+        raw_path = self.working_directory
+        if not isinstance(raw_path, str) or not raw_path.strip():
+            return self._resolve_working_directory(raw_path)
+        cached = self._resolved_working_directory
+        if cached is not None and cached[0] == self.working_directory:
+            return cached[1]
+        resolved = self._resolve_working_directory(self.working_directory)
+        self._resolved_working_directory = (self.working_directory, resolved)
+        return resolved
+
     @staticmethod
     def _resolve_working_directory(raw_path: str | None) -> str:
         if isinstance(raw_path, str):
@@ -1,9 +1,15 @@
 from __future__ import annotations
 
+import functools
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
+try:
+    import tomllib
+except ModuleNotFoundError:  # Python < 3.11
+    import tomli as tomllib
+
 _DEFAULT_PROFILE_NAME = "default"
 
 
@@ -88,7 +94,7 @@ def load_profiles_from_conf(
             working_directory=fallback_working_directory,
         )
 
-    payload = _load_toml(path)
+    payload = load_conf_toml(path)
     global_agents = _parse_agents_table(
         conf_path=path,
         raw_agents=payload.get("agents"),
@@ -177,17 +183,19 @@ def load_profiles_from_conf(
     return ProfileRegistry(profiles=parsed_profiles, default_name=default_name)
 
 
-def _load_toml(path: Path) -> dict[str, Any]:
+def load_conf_toml(path: Path) -> dict[str, Any]:
     try:
-        import tomllib
-    except Exception as exc:
-        try:
-            import tomli as tomllib
-        except Exception as tomli_exc:
-            raise RuntimeError(
-                "TOML parser is required. Use Python 3.11+ or install package `tomli`."
-            ) from tomli_exc
+        stat = path.stat()
+    except OSError as exc:
+        raise ValueError(f"failed to read {path}: {exc}") from exc
+    return _load_toml(path, stat.st_mtime_ns, stat.st_size)
+
 
+# Keyed by file stat so edits are picked up; callers must not mutate the
+# returned payload because it is shared between calls.
+@functools.lru_cache(maxsize=8)
+def _load_toml(path: Path, mtime_ns: int, size: int) -> dict[str, Any]:
+    del mtime_ns, size
     try:
         raw = path.read_text(encoding="utf-8")
     except OSError as exc:
@@ -60,22 +60,36 @@ class TraceLogger:
 
         return value
 
-    def _trace_path(self) -> Path:
-        date_part = datetime.now(timezone.utc).date().isoformat()
+    def _trace_path(self, timestamp: str) -> Path:
+        try:
+            date_part = datetime.fromisoformat(timestamp).astimezone(timezone.utc).date().isoformat()
+        except (TypeError, ValueError):
+            date_part = datetime.now(timezone.utc).date().isoformat()
         return self._base_dir / f"{date_part}.jsonl"
 
     def append(self, record: TraceRecord) -> None:
+        self.append_batch([record])
+
+    def append_batch(self, records: list[TraceRecord]) -> None:
+        if not records:
+            return
         self._ensure_base_dir()
-        payload = self._mask_payload(dict(record))
-        payload.setdefault(
-            "timestamp",
-            datetime.now(timezone.utc).isoformat(timespec="seconds"),
-        )
-
-        path = self._trace_path()
-        with path.open("a", encoding="utf-8") as fp:
-            fp.write(json.dumps(payload, ensure_ascii=False) + "\n")
-        try:
-            os.chmod(path, 0o600)
-        except OSError:
-            pass
+        # Each record goes to the file for the day it was stamped, so a batch
+        # flushed just after midnight still lands in the right files.
+        lines_by_path: dict[Path, list[str]] = {}
+        for record in records:
+            payload = self._mask_payload(dict(record))
+            payload.setdefault(
+                "timestamp",
+                datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            )
+            path = self._trace_path(payload["timestamp"])
+            lines_by_path.setdefault(path, []).append(json.dumps(payload, ensure_ascii=False) + "\n")
+
+        for path, lines in lines_by_path.items():
+            with path.open("a", encoding="utf-8") as fp:
+                fp.write("".join(lines))
+            try:
+                os.chmod(path, 0o600)
+            except OSError:
+                pass
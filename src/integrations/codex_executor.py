@@ -1,21 +1,22 @@
 from __future__ import annotations
 
 import asyncio
-import builtins
 import json
 import os
-import time
+import sys
 from contextlib import contextmanager
 from contextvars import ContextVar
 from dataclasses import dataclass, field
 from typing import Any, Callable, Protocol
 
+from core.models import local_timestamp
+
 
 class CodexExecutionError(RuntimeError):
     pass
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class AgentTextNotification:
     message_id: str
     phase: str
@@ -29,21 +30,13 @@ _ACTIVE_CODEX_AGENT_NAME: ContextVar[str | None] = ContextVar(
 )
 
 
-def _stdout_print(*values: object, **kwargs: Any) -> None:
-    file = kwargs.get("file")
-    if file is None:
-        timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
-        if values:
-            normalized_values: list[object] = list(values)
-            first_value = str(normalized_values[0])
-            normalized_values[0] = "\n".join(
-                f"[{timestamp}] {line}" for line in first_value.splitlines() or [""]
-            )
-            values = tuple(normalized_values)
-        else:
-            values = (f"[{timestamp}]",)
-
-    builtins.print(*values, **kwargs)
+def _stdout_print(message: object, *, flush: bool = False) -> None:
+    timestamp = local_timestamp()
+    sys.stdout.write(
+        "\n".join(f"[{timestamp}] {line}" for line in str(message).splitlines() or [""]) + "\n"
+    )
+    if flush:
+        sys.stdout.flush()
 
 
 @contextmanager
@@ -258,9 +251,18 @@ class OpenAIAgentsExecutor:
         )
 
     async def _handle_mcp_message(self, message: Any) -> None:
+        # Normalize the session message once; logging and extraction share the payload.
+        payload = self._codex_event_payload(message)
+        if payload is None:
+            return
+
+        params = payload.get("params")
         if self.verbose_stdout:
-            self._log_codex_event_message(message)
-        notification = self._extract_notification_from_session_message(message)
+            self._log_codex_event_params(params)
+        if not isinstance(params, dict):
+            return
+
+        notification = self._extract_notification_from_event_params(params)
         if notification is not None:
             self._emit_agent_notification(notification)
 
@@ -386,7 +388,7 @@ class OpenAIAgentsExecutor:
             pass
 
     @staticmethod
-    def _extract_notification_from_session_message(message: Any) -> AgentTextNotification | None:
+    def _codex_event_payload(message: Any) -> dict[str, Any] | None:
         notification: Any = message
         if hasattr(message, "root"):
             notification = message.root
@@ -400,25 +402,21 @@ class OpenAIAgentsExecutor:
 
         if notification.get("method") != "codex/event":
             return None
+        return notification
+
+    @staticmethod
+    def _extract_notification_from_session_message(message: Any) -> AgentTextNotification | None:
+        payload = OpenAIAgentsExecutor._codex_event_payload(message)
+        if payload is None:
+            return None
 
-        params = notification.get("params")
+        params = payload.get("params")
         if not isinstance(params, dict):
             return None
         return OpenAIAgentsExecutor._extract_notification_from_event_params(params)
 
-    def _log_codex_event_message(self, message: Any) -> None:
-        notification: Any = message
-        if hasattr(message, "root"):
-            notification = message.root
-        if hasattr(notification, "model_dump"):
-            notification = notification.model_dump()
-        elif hasattr(notification, "__dict__"):
-            notification = dict(vars(notification))
-        if not isinstance(notification, dict):
-            return
-        if notification.get("method") != "codex/event":
-            return
-        params = notification.get("params")
+    @staticmethod
+    def _log_codex_event_params(params: Any) -> None:
         _stdout_print(
             f"[codex-event] method=codex/event params={json.dumps(params, ensure_ascii=False)}",
             flush=True,
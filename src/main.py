@@ -8,7 +8,7 @@ from typing import Any
 
 from core.command_router import CommandRouter
 from core.orchestrator import BotOrchestrator
-from core.profiles import load_profiles_from_conf, resolve_conf_path
+from core.profiles import load_conf_toml, load_profiles_from_conf, resolve_conf_path
 from core.session_manager import SessionManager
 from core.trace_logger import TraceLogger
 from integrations.codex_executor import (
@@ -43,35 +43,13 @@ class _CodexRuntimeConfig:
     mcp_status_cmd: str | None = None
     mcp_auto_detect_process: bool = False
     max_review_rounds: int = 1
+    trace_enabled: bool = True
 
 
 def _load_toml_payload(conf_path: Path) -> dict[str, Any]:
     if not conf_path.exists():
         return {}
-
-    try:
-        import tomllib
-    except Exception as exc:
-        try:
-            import tomli as tomllib
-        except Exception as tomli_exc:
-            raise RuntimeError(
-                "TOML parser is required. Use Python 3.11+ or install package `tomli`."
-            ) from tomli_exc
-
-    try:
-        raw = conf_path.read_text(encoding="utf-8")
-    except OSError as exc:
-        raise ValueError(f"failed to read {conf_path}: {exc}") from exc
-
-    try:
-        payload = tomllib.loads(raw)
-    except Exception as exc:
-        raise ValueError(f"failed to parse {conf_path}: {exc}") from exc
-
-    if not isinstance(payload, dict):
-        raise ValueError(f"{conf_path}: root must be a table")
-    return payload
+    return load_conf_toml(conf_path)
 
 
 def _optional_string(
@@ -225,6 +203,12 @@ def _load_codex_runtime_config(conf_path: Path) -> _CodexRuntimeConfig:
         key_name="codex.max_review_rounds",
         default=1,
     )
+    trace_enabled = _required_bool(
+        value=raw_codex.get("trace_enabled"),
+        conf_path=conf_path,
+        key_name="codex.trace_enabled",
+        default=True,
+    )
 
     if mcp_direct_status:
         mcp_status_cmd = None
@@ -243,6 +227,7 @@ def _load_codex_runtime_config(conf_path: Path) -> _CodexRuntimeConfig:
         mcp_status_cmd=mcp_status_cmd,
         mcp_auto_detect_process=mcp_auto_detect_process,
         max_review_rounds=max_review_rounds,
+        trace_enabled=trace_enabled,
     )
 
 
@@ -293,4 +278,5 @@ def build_orchestrator() -> BotOrchestrator:
         codex_mcp=codex_mcp,
         working_directory=getattr(executor, "cwd", None) or default_profile.working_directory,
         profile_registry=profile_registry,
+        trace_enabled=codex_config.trace_enabled,
     )
@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import contextvars
 import json
 import os
 import re
@@ -20,14 +19,6 @@ from workflows.types import (
     Workflow,
 )
 
-_MODE_SELECT_CALLBACK: contextvars.ContextVar[
-    Callable[[str, str], None] | None
-] = contextvars.ContextVar("mode_select_callback", default=None)
-
-_AGENT_TRANSFER_CALLBACK: contextvars.ContextVar[
-    Callable[[str, str, int], None] | None
-] = contextvars.ContextVar("agent_transfer_callback", default=None)
-
 _MAX_REVIEW_FEEDBACK_CHARS = 1200
 _MAX_PLANNER_OUTPUT_CHARS = 1500
 _MAX_HISTORY_ITEMS = 20
@@ -349,9 +340,7 @@ class PlanWorkflow:
     on_agent_transfer: Callable[[str, str, int], None] | None = None
 
     def _notify_agent_transfer(self, from_agent: str, to_agent: str, round: int) -> None:
-        callback = _AGENT_TRANSFER_CALLBACK.get()
-        if callback is None:
-            callback = self.on_agent_transfer
+        callback = self.on_agent_transfer
         if callback is not None:
             callback(from_agent, to_agent, round)
 
@@ -361,9 +350,7 @@ class PlanWorkflow:
         selector_decision = await self.selector.select_mode(user_input=input_text, session=session)
 
         if selector_decision.mode == "plan":
-            callback = _MODE_SELECT_CALLBACK.get()
-            if callback is None:
-                callback = self.on_mode_selected
+            callback = self.on_mode_selected
             if callback is not None:
                 callback(selector_decision.mode, selector_decision.reason)
 
@@ -2,11 +2,13 @@ import asyncio
 import io
 import unittest
 from contextlib import redirect_stdout
+from unittest.mock import patch
 
 from integrations.codex_executor import (
     AgentTextNotification,
     CodexExecutionError,
     OpenAIAgentsExecutor,
+    _stdout_print,
 )
 
 
@@ -247,6 +249,54 @@ class OpenAIAgentsExecutorTests(unittest.TestCase):
             ),
         )
 
+    def test_handle_mcp_message_logs_and_forwards_codex_event(self) -> None:
+        received: list[AgentTextNotification] = []
+        executor = OpenAIAgentsExecutor(on_agent_message=received.append, verbose_stdout=True)
+        payload = {
+            "method": "codex/event",
+            "params": {
+                "id": "evt_1",
+                "msg": {"type": "agent_message", "message": "working"},
+            },
+        }
+
+        captured = io.StringIO()
+        with redirect_stdout(captured):
+            asyncio.run(executor._handle_mcp_message(payload))
+
+        self.assertIn("[codex-event] method=codex/event", captured.getvalue())
+        self.assertEqual(
+            received,
+            [AgentTextNotification(message_id="evt_1", phase="commentary", text="working")],
+        )
+
+    def test_handle_mcp_message_ignores_other_methods(self) -> None:
+        received: list[AgentTextNotification] = []
+        executor = OpenAIAgentsExecutor(on_agent_message=received.append, verbose_stdout=True)
+
+        captured = io.StringIO()
+        with redirect_stdout(captured):
+            asyncio.run(executor._handle_mcp_message({"method": "notifications/progress", "params": {}}))
+
+        self.assertEqual(captured.getvalue(), "")
+        self.assertEqual(received, [])
+
+
+class StdoutPrintTests(unittest.TestCase):
+    def test_stdout_print_timestamps_each_line_with_one_write(self) -> None:
+        captured = io.StringIO()
+        with (
+            patch("core.models.time.time", return_value=1771751800.0),
+            patch("core.models.time.strftime", return_value="2026-02-22 09:16:40"),
+            redirect_stdout(captured),
+        ):
+            _stdout_print("[codex-event] a\nb", flush=True)
+
+        self.assertEqual(
+            captured.getvalue(),
+            "[2026-02-22 09:16:40] [codex-event] a\n[2026-02-22 09:16:40] b\n",
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
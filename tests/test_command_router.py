@@ -54,6 +54,12 @@ class CommandRouterTests(unittest.TestCase):
         self.assertEqual(route.kind, "text")
         self.assertEqual(route.text, "add a textbox to the file")
 
+    def test_empty_input_shares_one_text_route(self) -> None:
+        route = self.router.route("   ")
+        self.assertEqual(route.kind, "text")
+        self.assertEqual(route.text, "")
+        self.assertIs(self.router.route(None), route)
+
     def test_plain_profile_command_is_parsed(self) -> None:
         route = self.router.route("profile bridge")
         self.assertEqual(route.kind, "bot_command")
@@ -22,6 +22,7 @@ class MainBuildOrchestratorTests(unittest.TestCase):
         executor = self._executor_of(orchestrator)
         self.assertEqual(executor.approval_policy, "never")
         self.assertEqual(executor.sandbox, "danger-full-access")
+        self.assertTrue(orchestrator.trace_enabled)
 
     def test_external_status_mode_can_be_enabled(self) -> None:
         with tempfile.TemporaryDirectory() as tmp:
@@ -34,6 +35,7 @@ sandbox = "workspace-write"
 mcp_direct_status = false
 mcp_status_cmd = "echo running=true"
 mcp_auto_detect_process = true
+trace_enabled = false
 """.strip(),
                 encoding="utf-8",
             )
@@ -46,6 +48,7 @@ mcp_auto_detect_process = true
         executor = self._executor_of(orchestrator)
         self.assertEqual(executor.approval_policy, "on-request")
         self.assertEqual(executor.sandbox, "workspace-write")
+        self.assertFalse(orchestrator.trace_enabled)
 
 
 if __name__ == "__main__":
@@ -1,7 +1,10 @@
 import asyncio
+import json
+import os
 import tempfile
 import unittest
 from pathlib import Path
+from unittest.mock import patch
 
 from core.command_router import CommandRouter
 from core.orchestrator import BotOrchestrator
@@ -95,6 +98,73 @@ class OrchestratorTests(unittest.TestCase):
             self.assertIn("plan_review=rounds=1/3, result=approved", status)
             self.assertIn("codex_mcp=running=true, ready=true, pid=", status)
 
+    def test_traces_are_batched_off_the_request_path(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            orchestrator = self._build(Path(tmp))
+
+            async def _scenario() -> None:
+                await orchestrator.handle_message("1", "2", "/status")
+                await orchestrator.handle_message("1", "2", "/new")
+                await orchestrator.flush_traces()
+
+            asyncio.run(_scenario())
+
+            trace_files = list((Path(tmp) / "traces").glob("*.jsonl"))
+            self.assertEqual(len(trace_files), 1)
+            records = [json.loads(line) for line in trace_files[0].read_text(encoding="utf-8").splitlines()]
+            self.assertEqual([record["input_text"] for record in records], ["/status", "/new"])
+            self.assertTrue(all(record["timestamp"] for record in records))
+
+    def test_traces_pending_at_loop_teardown_are_still_written(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            orchestrator = self._build(Path(tmp))
+
+            async def _scenario() -> None:
+                orchestrator._safe_trace({"input_text": "first"})
+                await asyncio.sleep(0)
+                # The flusher is now writing "first", so "second" waits in the
+                # buffer when asyncio.run cancels it.
+                orchestrator._safe_trace({"input_text": "second"})
+
+            asyncio.run(_scenario())
+            self.assertTrue(orchestrator._trace_flusher.cancelled())
+            # A later loop can still flush without tripping over the cancelled task.
+            asyncio.run(orchestrator.flush_traces())
+
+            trace_files = list((Path(tmp) / "traces").glob("*.jsonl"))
+            self.assertEqual(len(trace_files), 1)
+            records = [json.loads(line) for line in trace_files[0].read_text(encoding="utf-8").splitlines()]
+            self.assertEqual(sorted(record["input_text"] for record in records), ["first", "second"])
+
+    def test_trace_writes_hold_the_write_lock(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            orchestrator = self._build(Path(tmp))
+            held: list[bool] = []
+            orchestrator.trace_logger.append_batch = lambda batch: held.append(
+                orchestrator._trace_write_lock.locked()
+            )
+
+            async def _scenario() -> None:
+                orchestrator._safe_trace({"input_text": "one"})
+                await orchestrator.flush_traces()
+
+            asyncio.run(_scenario())
+
+            self.assertEqual(held, [True])
+
+    def test_disabled_tracing_writes_nothing(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            orchestrator = self._build(Path(tmp))
+            orchestrator.trace_enabled = False
+
+            async def _scenario() -> None:
+                await orchestrator.handle_message("1", "2", "/status")
+                await orchestrator.flush_traces()
+
+            asyncio.run(_scenario())
+
+            self.assertFalse((Path(tmp) / "traces").exists())
+
     def test_plan_mode_runs_plan_workflow(self) -> None:
         with tempfile.TemporaryDirectory() as tmp:
             orchestrator = self._build(Path(tmp))
@@ -117,6 +187,42 @@ class OrchestratorTests(unittest.TestCase):
             self.assertIn("/cancel", output)
             self.assertIn(f"working_directory={Path(tmp).resolve()}", output)
 
+    def test_start_command_resolves_working_directory_once(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp, tempfile.TemporaryDirectory() as other:
+            orchestrator = self._build(Path(tmp))
+            orchestrator.working_directory = tmp
+
+            with patch.object(
+                BotOrchestrator,
+                "_resolve_working_directory",
+                side_effect=lambda raw: str(Path(raw).resolve()),
+            ) as resolve:
+                asyncio.run(orchestrator.handle_message("1", "2", "/start"))
+                asyncio.run(orchestrator.handle_message("1", "2", "/start"))
+                self.assertEqual(resolve.call_count, 1)
+
+                orchestrator.working_directory = other
+                output = asyncio.run(orchestrator.handle_message("1", "2", "/start"))
+                self.assertEqual(resolve.call_count, 2)
+
+            self.assertIn(f"working_directory={Path(other).resolve()}", output)
+
+    def test_start_command_follows_cwd_without_working_directory(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp, tempfile.TemporaryDirectory() as other:
+            orchestrator = self._build(Path(tmp))
+            orchestrator.working_directory = None
+            previous_cwd = os.getcwd()
+            try:
+                os.chdir(tmp)
+                first = asyncio.run(orchestrator.handle_message("1", "2", "/start"))
+                os.chdir(other)
+                second = asyncio.run(orchestrator.handle_message("1", "2", "/start"))
+            finally:
+                os.chdir(previous_cwd)
+
+            self.assertIn(f"working_directory={Path(tmp).resolve()}", first)
+            self.assertIn(f"working_directory={Path(other).resolve()}", second)
+
     def test_new_command_resets_session(self) -> None:
         with tempfile.TemporaryDirectory() as tmp:
             orchestrator = self._build(Path(tmp))
@@ -2,7 +2,7 @@ import tempfile
 import unittest
 from pathlib import Path
 
-from core.profiles import load_profiles_from_conf
+from core.profiles import load_conf_toml, load_profiles_from_conf
 
 
 class ProfilesTests(unittest.TestCase):
@@ -192,6 +192,18 @@ system_prompt = "Developer prompt"
             self.assertEqual(developer.model, "gpt-5-dev")
             self.assertEqual(developer.system_prompt, "Developer prompt")
 
+    def test_load_conf_toml_reuses_payload_until_file_changes(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            conf = Path(tmp) / "conf.toml"
+            conf.write_text('[profile]\ndefault = "a"\n', encoding="utf-8")
+
+            first = load_conf_toml(conf)
+            self.assertIs(load_conf_toml(conf), first)
+
+            conf.write_text('[profile]\ndefault = "bb"\n', encoding="utf-8")
+            updated = load_conf_toml(conf)
+            self.assertEqual(updated["profile"]["default"], "bb")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -4,7 +4,9 @@ import tempfile
 import unittest
 from datetime import datetime, timezone
 from pathlib import Path
+from unittest.mock import patch
 
+from core.models import utc_now_iso
 from core.session_manager import SessionManager
 from core.trace_logger import TraceLogger
 
@@ -33,6 +35,17 @@ class SessionAndTraceTests(unittest.TestCase):
             session_file = tmp_path / "sessions" / "100-200.json"
             self.assertTrue(session_file.exists())
 
+    def test_session_round_trips_without_orjson(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp, patch("core.session_manager.orjson", None):
+            manager = SessionManager(base_dir=Path(tmp) / "sessions")
+            session = asyncio.run(manager.load(chat_id="100", user_id="200"))
+            session.history = [{"role": "user", "content": "안녕"}]
+            asyncio.run(manager.save(session))
+
+            loaded = asyncio.run(manager.load(chat_id="100", user_id="200"))
+            self.assertEqual(loaded.history, [{"role": "user", "content": "안녕"}])
+            self.assertIn("안녕", (Path(tmp) / "sessions" / "100-200.json").read_text(encoding="utf-8"))
+
     def test_trace_logger_masks_sensitive_values(self) -> None:
         with tempfile.TemporaryDirectory() as tmp:
             tmp_path = Path(tmp)
@@ -61,6 +74,36 @@ class SessionAndTraceTests(unittest.TestCase):
             self.assertIn("token=***", payload["input_text"])
             self.assertEqual(payload["output_text"], "api_key=***")
 
+    def test_trace_logger_writes_each_record_to_its_own_day(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            base_dir = Path(tmp) / "traces"
+            logger = TraceLogger(base_dir=base_dir)
+
+            logger.append_batch(
+                [
+                    {"run_id": "run-1", "timestamp": "2026-02-21T23:59:59+00:00"},
+                    {"run_id": "run-2", "timestamp": "2026-02-22T00:00:01+00:00"},
+                    {"run_id": "run-3", "timestamp": "2026-02-22T00:00:02+00:00"},
+                ]
+            )
+
+            self.assertEqual(
+                sorted(path.name for path in base_dir.glob("*.jsonl")),
+                ["2026-02-21.jsonl", "2026-02-22.jsonl"],
+            )
+            second_day = (base_dir / "2026-02-22.jsonl").read_text(encoding="utf-8").splitlines()
+            self.assertEqual([json.loads(line)["run_id"] for line in second_day], ["run-2", "run-3"])
+
+    def test_utc_now_iso_formats_once_per_second(self) -> None:
+        with patch("core.models.time.time", side_effect=[1771751400.2, 1771751400.8, 1771751401.0]):
+            first = utc_now_iso()
+            second = utc_now_iso()
+            third = utc_now_iso()
+
+        self.assertEqual(first, "2026-02-22T09:10:00+00:00")
+        self.assertIs(second, first)
+        self.assertEqual(third, "2026-02-22T09:10:01+00:00")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,24 @@
+import unittest
+
+from bot.telegram_adapter import split_telegram_text
+
+
+class SplitTelegramTextTests(unittest.TestCase):
+    def test_short_text_is_returned_as_is(self) -> None:
+        self.assertEqual(split_telegram_text("hello", max_chars=10), ["hello"])
+
+    def test_splits_at_last_newline_and_drops_separating_newlines(self) -> None:
+        self.assertEqual(
+            split_telegram_text("aaa\nbb\n\n\ncccc", max_chars=7),
+            ["aaa\nbb", "cccc"],
+        )
+
+    def test_hard_splits_lines_longer_than_limit(self) -> None:
+        self.assertEqual(
+            split_telegram_text("abcdefghij\nxy", max_chars=4),
+            ["abcd", "efgh", "ij", "xy"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,25 +1,43 @@
 import asyncio
+import io
+import logging
+import signal
 import tempfile
 import unittest
 from pathlib import Path
+from types import SimpleNamespace
 from unittest.mock import patch
 
+import httpx
+
+from bot.telegram_adapter import TelegramInboundMessage, parse_update
 from integrations.codex_executor import AgentTextNotification, CodexMcpExecutor
 from scripts.telegram_polling_runner import (
+    TelegramBotApi,
     _AgentMessageDispatcher,
+    _ChatRequestQueues,
+    _GracefulShutdown,
+    _SuppressMcpValidationNoiseFilter,
     _parse_args,
     _cancel_inflight_request,
+    _configure_logging,
     _format_intermediate_notification_text,
+    _fetch_inbound_updates,
     _format_inbound_stdout,
     _is_cancel_command,
     _load_allowed_users_from_conf,
     _load_runner_config_from_conf,
+    _log,
+    _next_inbound,
     _next_offset_from_updates,
+    _next_poll_timeout,
+    _poll_updates,
     _run_polling,
     _resolve_conf_path,
     _render_progress_message,
     _run_with_progress_notifications,
-    _stdout_print,
+    _safe_send,
+    _stop_logging,
     _wait_for_request_completion,
 )
 
@@ -31,6 +49,9 @@ class _FakeTelegramApi:
     def send_message(self, *, chat_id: str, text: str) -> None:
         self.messages.append((chat_id, text))
 
+    async def send_message_async(self, *, chat_id: str, text: str) -> None:
+        self.send_message(chat_id=chat_id, text=text)
+
 
 class _SlowOrchestrator:
     def __init__(self, delay_sec: float, output: str) -> None:
@@ -139,12 +160,48 @@ class TelegramPollingRunnerProgressTests(unittest.TestCase):
 
         self.assertFalse(asyncio.run(_scenario()))
 
+    def test_wait_for_request_completion_returns_true_when_task_cancelled(self) -> None:
+        async def _never() -> None:
+            await asyncio.sleep(30)
+
+        async def _scenario() -> bool:
+            task = asyncio.create_task(_never())
+            await asyncio.sleep(0)
+            task.cancel()
+            return await _wait_for_request_completion(request_task=task, timeout_sec=1)
+
+        self.assertTrue(asyncio.run(_scenario()))
+
+    def test_wait_for_request_completion_propagates_waiter_cancellation(self) -> None:
+        async def _never() -> None:
+            await asyncio.sleep(30)
+
+        async def _scenario() -> bool:
+            task = asyncio.create_task(_never())
+            waiter = asyncio.create_task(
+                _wait_for_request_completion(request_task=task, timeout_sec=5)
+            )
+            await asyncio.sleep(0)
+            waiter.cancel()
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                pass
+            still_running = not task.done()
+            task.cancel()
+            return waiter.cancelled() and still_running
+
+        self.assertTrue(asyncio.run(_scenario()))
+
     def test_is_cancel_command_parses_plain_and_mention_forms(self) -> None:
         self.assertTrue(_is_cancel_command("/cancel"))
         self.assertTrue(_is_cancel_command("/cancel   "))
         self.assertTrue(_is_cancel_command("/cancel@my_bot"))
         self.assertFalse(_is_cancel_command("/status"))
         self.assertFalse(_is_cancel_command("cancel"))
+        self.assertTrue(_is_cancel_command("  /CANCEL now"))
+        self.assertFalse(_is_cancel_command("/cancelled"))
+        self.assertFalse(_is_cancel_command(None))
 
     def test_format_inbound_stdout_escapes_newlines(self) -> None:
         rendered = _format_inbound_stdout(
@@ -157,17 +214,85 @@ class TelegramPollingRunnerProgressTests(unittest.TestCase):
             "[telegram-inbound] chat_id=100 user_id=200 text=line1\\nline2\\rline3",
         )
 
-    def test_stdout_print_prefixes_timestamp(self) -> None:
+    def test_log_writes_timestamped_lines_to_stdout(self) -> None:
         with (
-            patch("scripts.telegram_polling_runner.time.strftime", return_value="2026-02-22 09:10:11"),
-            patch("builtins.print") as mocked_print,
+            patch("core.models.time.time", return_value=1771751600.0),
+            patch("core.models.time.strftime", return_value="2026-02-22 09:13:20"),
+            patch("scripts.telegram_polling_runner.sys.stdout") as mocked_stdout,
         ):
-            _stdout_print("[info] hello", flush=True)
+            _log("[info] first\nsecond", flush=True)
 
-        mocked_print.assert_called_once_with(
-            "[2026-02-22 09:10:11] [info] hello",
-            flush=True,
+        mocked_stdout.write.assert_called_once_with(
+            "[2026-02-22 09:13:20] [info] first\n[2026-02-22 09:13:20] second\n"
+        )
+        mocked_stdout.flush.assert_called_once_with()
+
+    def test_log_reuses_timestamp_within_same_second(self) -> None:
+        with (
+            patch("core.models.time.time", side_effect=[1771751500.1, 1771751500.9]),
+            patch(
+                "core.models.time.strftime",
+                return_value="2026-02-22 09:11:40",
+            ) as mocked_strftime,
+            patch("scripts.telegram_polling_runner.sys.stdout") as mocked_stdout,
+        ):
+            _log("[info] one")
+            _log("[info] two")
+
+        mocked_strftime.assert_called_once()
+        self.assertEqual(mocked_stdout.write.call_args.args, ("[2026-02-22 09:11:40] [info] two\n",))
+
+    def test_log_hands_lines_to_listener_thread_once_configured(self) -> None:
+        stream = io.StringIO()
+        root = logging.getLogger()
+        client_logger = logging.getLogger("client")
+        previous_level = root.level
+        previous_client_filters = list(client_logger.filters)
+        noisy = logging.LogRecord(
+            "client",
+            logging.WARNING,
+            __file__,
+            1,
+            "Failed to validate notification: %s",
+            ("codex/event",),
+            None,
+        )
+        try:
+            with (
+                patch("scripts.telegram_polling_runner.sys.stdout", stream),
+                patch("core.models.time.time", return_value=1771751700.0),
+                patch("core.models.time.strftime", return_value="2026-02-22 09:15:00"),
+            ):
+                _configure_logging()
+                _log("[info] queued", flush=True)
+                self.assertFalse(client_logger.filter(noisy))
+                _stop_logging()
+        finally:
+            root.setLevel(previous_level)
+
+        self.assertEqual(client_logger.filters, previous_client_filters)
+        self.assertTrue(client_logger.filter(noisy))
+
+        self.assertEqual(stream.getvalue(), "[2026-02-22 09:15:00] [info] queued\n")
+
+    def test_mcp_validation_noise_filter_drops_codex_event_warnings(self) -> None:
+        noise_filter = _SuppressMcpValidationNoiseFilter()
+
+        def _record(level: int, msg: str, args: tuple = ()) -> logging.LogRecord:
+            return logging.LogRecord("mcp", level, __file__, 1, msg, args, None)
+
+        self.assertFalse(
+            noise_filter.filter(
+                _record(logging.WARNING, "Failed to validate notification: x. Message was: codex/event")
+            )
+        )
+        self.assertFalse(
+            noise_filter.filter(
+                _record(logging.WARNING, "Failed to validate notification: %s", ("method=codex/event",))
+            )
         )
+        self.assertTrue(noise_filter.filter(_record(logging.WARNING, "Failed to validate notification: other")))
+        self.assertTrue(noise_filter.filter(_record(logging.INFO, "Failed to validate notification: codex/event")))
 
     def test_parse_args_supports_verbose_and_conf(self) -> None:
         with patch("sys.argv", ["telegram_polling_runner.py", "--verbose", "--conf", "/tmp/a.toml"]):
@@ -175,6 +300,18 @@ class TelegramPollingRunnerProgressTests(unittest.TestCase):
         self.assertEqual(conf_path, "/tmp/a.toml")
         self.assertTrue(verbose)
 
+    def test_parse_args_accepts_equals_form_and_ignores_unknown_args(self) -> None:
+        with patch("sys.argv", ["telegram_polling_runner.py", "--conf=/tmp/b.toml", "--extra"]):
+            conf_path, verbose = _parse_args()
+        self.assertEqual(conf_path, "/tmp/b.toml")
+        self.assertFalse(verbose)
+
+    def test_parse_args_does_not_expand_abbreviated_options(self) -> None:
+        with patch("sys.argv", ["telegram_polling_runner.py", "--verb", "--ver", "--co=/tmp/c.toml"]):
+            conf_path, verbose = _parse_args()
+        self.assertIsNone(conf_path)
+        self.assertFalse(verbose)
+
     def test_process_inbound_request_closes_mcp_session(self) -> None:
         orchestrator = _TrackingOrchestrator()
         api = _FakeTelegramApi()
@@ -204,14 +341,8 @@ class TelegramPollingRunnerProgressTests(unittest.TestCase):
         orchestrator = _ModeAwareOrchestrator(mode="plan", output="done")
         api = _FakeTelegramApi()
 
-        async def _fake_run_blocking(func, /, *args, **kwargs):
-            return func(*args, **kwargs)
-
         async def _scenario() -> None:
-            with (
-                patch("scripts.telegram_polling_runner._close_codex_mcp") as mocked_close,
-                patch("scripts.telegram_polling_runner._run_blocking", side_effect=_fake_run_blocking),
-            ):
+            with patch("scripts.telegram_polling_runner._close_codex_mcp") as mocked_close:
                 await _process_inbound_request(
                     orchestrator=orchestrator,
                     api=api,
@@ -249,6 +380,13 @@ class TelegramPollingRunnerProgressTests(unittest.TestCase):
             self.assertTrue(path.exists())
             self.assertIn("[telegram]", path.read_text(encoding="utf-8"))
 
+    def test_load_allowed_users_from_conf_keeps_existing_file(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "conf.toml"
+            path.write_text("[telegram]\nallowed_users = [7]\n", encoding="utf-8")
+            self.assertEqual(_load_allowed_users_from_conf(str(path)), frozenset({7}))
+            self.assertEqual(path.read_text(encoding="utf-8"), "[telegram]\nallowed_users = [7]\n")
+
     def test_resolve_conf_path_expands_tilde(self) -> None:
         home = Path.home()
         resolved = _resolve_conf_path("~/.codex-orchestrator/conf.toml")
@@ -265,7 +403,20 @@ allowed_users = [123456789, "987654321"]
                 encoding="utf-8",
             )
             parsed = _load_allowed_users_from_conf(str(path))
-            self.assertEqual(parsed, {"123456789", "987654321"})
+            self.assertEqual(parsed, frozenset({123456789, 987654321}))
+
+    def test_load_allowed_users_from_conf_keeps_non_numeric_ids_as_strings(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "conf.toml"
+            path.write_text(
+                """
+[telegram]
+allowed_users = [" 42 ", "ops-bot", "\u00b2"]
+""".strip(),
+                encoding="utf-8",
+            )
+            parsed = _load_allowed_users_from_conf(str(path))
+            self.assertEqual(parsed, frozenset({42, "ops-bot", "\u00b2"}))
 
     def test_load_allowed_users_from_conf_rejects_invalid_type(self) -> None:
         with tempfile.TemporaryDirectory() as tmp:
@@ -302,7 +453,7 @@ cancel_wait_timeout_sec = 3
 
             _, runner_conf = _load_runner_config_from_conf(str(path))
 
-            self.assertEqual(runner_conf.allowed_users, {"123456789", "987654321"})
+            self.assertEqual(runner_conf.allowed_users, frozenset({123456789, 987654321}))
             self.assertEqual(runner_conf.polling.poll_timeout, 15)
             self.assertEqual(runner_conf.polling.loop_sleep_sec, 0.5)
             self.assertFalse(runner_conf.polling.delete_webhook_on_start)
@@ -311,6 +462,21 @@ cancel_wait_timeout_sec = 3
             self.assertFalse(runner_conf.polling.require_mcp_warmup)
             self.assertEqual(runner_conf.polling.cancel_wait_timeout_sec, 3.0)
 
+    def test_load_runner_config_from_conf_reuses_cached_config_until_file_changes(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "conf.toml"
+            path.write_text("[telegram.polling]\npoll_timeout = 15\n", encoding="utf-8")
+
+            _, first = _load_runner_config_from_conf(str(path))
+            with patch("core.profiles.tomllib.loads") as mocked_loads:
+                _, second = _load_runner_config_from_conf(str(path))
+            mocked_loads.assert_not_called()
+            self.assertIs(first, second)
+
+            path.write_text("[telegram.polling]\npoll_timeout = 120\n", encoding="utf-8")
+            _, third = _load_runner_config_from_conf(str(path))
+            self.assertEqual(third.polling.poll_timeout, 120)
+
     def test_load_runner_config_from_conf_rejects_invalid_poll_timeout(self) -> None:
         with tempfile.TemporaryDirectory() as tmp:
             path = Path(tmp) / "conf.toml"
@@ -388,11 +554,172 @@ poll_timeout = "30"
     def test_next_offset_from_updates_returns_latest_plus_one(self) -> None:
         updates = [
             {"update_id": 10},
-            {"update_id": 14},
             {"update_id": 11},
+            {"update_id": 14},
         ]
         self.assertEqual(_next_offset_from_updates(updates), 15)
 
+    def test_next_offset_from_updates_skips_trailing_invalid_update_id(self) -> None:
+        updates = [
+            {"update_id": 10},
+            {"update_id": 11},
+            {"update_id": "12"},
+        ]
+        self.assertEqual(_next_offset_from_updates(updates), 12)
+
+    def test_next_poll_timeout_short_polls_after_full_batch(self) -> None:
+        full_batch = [{"update_id": index} for index in range(100)]
+        self.assertEqual(_next_poll_timeout(full_batch, 30), 0)
+        self.assertEqual(_next_poll_timeout(full_batch[:3], 30), 30)
+        self.assertEqual(_next_poll_timeout([], 30), 30)
+
+    def test_fetch_inbound_updates_queues_messages_and_advances_offset(self) -> None:
+        def _update(update_id: int, text: str) -> dict:
+            return {
+                "update_id": update_id,
+                "message": {"text": text, "chat": {"id": 100}, "from": {"id": 200}},
+            }
+
+        batches: list = [
+            [_update(7, "first"), {"update_id": 8}],
+            RuntimeError("network down"),
+            [_update(9, "second")],
+        ]
+        offsets: list[int | None] = []
+
+        async def _fake_poll_updates(api, *, offset, timeout):
+            offsets.append(offset)
+            if not batches:
+                await asyncio.Event().wait()
+            batch = batches.pop(0)
+            if isinstance(batch, Exception):
+                raise batch
+            return batch
+
+        async def _scenario() -> list[str]:
+            inbound_queue: asyncio.Queue = asyncio.Queue()
+            with (
+                patch("scripts.telegram_polling_runner._poll_updates", side_effect=_fake_poll_updates),
+                patch("scripts.telegram_polling_runner._log") as mocked_log,
+            ):
+                fetch_task = asyncio.create_task(
+                    _fetch_inbound_updates(
+                        object(),
+                        inbound_queue,
+                        offset=5,
+                        poll_timeout=30,
+                        error_backoff_sec=0,
+                    )
+                )
+                texts = [(await inbound_queue.get()).text for _ in range(2)]
+                fetch_task.cancel()
+            mocked_log.assert_called_once_with("[warn] polling loop error: network down")
+            return texts
+
+        self.assertEqual(asyncio.run(_scenario()), ["first", "second"])
+        self.assertEqual(offsets[:3], [5, 9, 9])
+
+    def test_fetch_inbound_updates_skips_update_that_fails_to_parse(self) -> None:
+        def _update(update_id: int, text: str) -> dict:
+            return {
+                "update_id": update_id,
+                "message": {"text": text, "chat": {"id": 100}, "from": {"id": 200}},
+            }
+
+        batches: list = [[_update(7, "broken"), _update(8, "ok")], [_update(9, "next")]]
+        offsets: list[int | None] = []
+        real_parse_update = parse_update
+
+        def _flaky_parse_update(update: dict):
+            if update["update_id"] == 7:
+                raise ValueError("bad update")
+            return real_parse_update(update)
+
+        async def _fake_poll_updates(api, *, offset, timeout):
+            offsets.append(offset)
+            if not batches:
+                await asyncio.Event().wait()
+            return batches.pop(0)
+
+        async def _scenario() -> list[str]:
+            inbound_queue: asyncio.Queue = asyncio.Queue()
+            with (
+                patch("scripts.telegram_polling_runner._poll_updates", side_effect=_fake_poll_updates),
+                patch("scripts.telegram_polling_runner.parse_update", side_effect=_flaky_parse_update),
+                patch("scripts.telegram_polling_runner._log") as mocked_log,
+            ):
+                fetch_task = asyncio.create_task(
+                    _fetch_inbound_updates(
+                        object(),
+                        inbound_queue,
+                        offset=None,
+                        poll_timeout=30,
+                        error_backoff_sec=1.0,
+                    )
+                )
+                texts = [(await inbound_queue.get()).text for _ in range(2)]
+                self.assertFalse(fetch_task.done())
+                fetch_task.cancel()
+            mocked_log.assert_called_once_with("[warn] failed to parse telegram update: bad update")
+            return texts
+
+        self.assertEqual(asyncio.run(_scenario()), ["ok", "next"])
+        self.assertEqual(offsets[:2], [None, 9])
+
+    def test_next_inbound_raises_when_fetcher_crashes(self) -> None:
+        async def _crashing_fetcher() -> None:
+            raise RuntimeError("boom")
+
+        async def _scenario() -> None:
+            fetch_task = asyncio.create_task(_crashing_fetcher())
+            with patch("scripts.telegram_polling_runner._log") as mocked_log:
+                with self.assertRaisesRegex(RuntimeError, "fetcher stopped"):
+                    await asyncio.wait_for(_next_inbound(asyncio.Queue(), fetch_task), timeout=1)
+            mocked_log.assert_called_once()
+            self.assertIn("boom", mocked_log.call_args.args[0])
+
+        asyncio.run(_scenario())
+
+    def test_fetch_inbound_updates_backs_off_exponentially_until_success(self) -> None:
+        outcomes: list = [
+            RuntimeError("429"),
+            RuntimeError("429"),
+            RuntimeError("502"),
+            [{"update_id": 1, "message": {"text": "hi", "chat": {"id": 100}, "from": {"id": 200}}}],
+            RuntimeError("timeout"),
+        ]
+        sleeps: list[float] = []
+
+        async def _fake_poll_updates(api, *, offset, timeout):
+            if not outcomes:
+                raise asyncio.CancelledError
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        async def _fake_sleep(delay: float) -> None:
+            sleeps.append(delay)
+
+        async def _scenario() -> None:
+            with (
+                patch("scripts.telegram_polling_runner._poll_updates", side_effect=_fake_poll_updates),
+                patch("scripts.telegram_polling_runner.asyncio.sleep", side_effect=_fake_sleep),
+                patch("scripts.telegram_polling_runner.random.uniform", side_effect=lambda low, high: high),
+                patch("scripts.telegram_polling_runner._log"),
+            ):
+                with self.assertRaises(asyncio.CancelledError):
+                    await _fetch_inbound_updates(
+                        object(),
+                        asyncio.Queue(),
+                        offset=None,
+                        poll_timeout=30,
+                        error_backoff_sec=1.0,
+                    )
+
+        asyncio.run(_scenario())
+        self.assertEqual(sleeps, [1.0, 2.0, 4.0, 1.0])
+
     def test_next_offset_from_updates_ignores_invalid_update_id(self) -> None:
         updates = [
             {"update_id": "10"},
@@ -431,13 +758,7 @@ poll_timeout = "30"
         )
         api = _FakeTelegramApi()
 
-        async def _fake_run_blocking(func, /, *args, **kwargs):
-            return func(*args, **kwargs)
-
-        with (
-            patch("scripts.telegram_polling_runner._run_blocking", side_effect=_fake_run_blocking),
-            patch("scripts.telegram_polling_runner._stdout_print") as mocked_stdout,
-        ):
+        with patch("scripts.telegram_polling_runner._log") as mocked_stdout:
             output, final_answer_sent = asyncio.run(
                 _run_with_progress_notifications(
                     orchestrator=orchestrator,
@@ -466,8 +787,10 @@ poll_timeout = "30"
         self.assertEqual(
             api.messages,
             [
-                ("100", "[agent transfer] threadId:100:200\n[plan.developer] working"),
-                ("100", "[agent transfer] threadId:100:200\n[plan.developer] done"),
+                (
+                    "100",
+                    "[agent transfer] threadId:100:200\n[plan.developer] working\n[plan.developer] done",
+                ),
             ],
         )
 
@@ -485,23 +808,19 @@ poll_timeout = "30"
         )
         api = _FakeTelegramApi()
 
-        async def _fake_run_blocking(func, /, *args, **kwargs):
-            return func(*args, **kwargs)
-
-        with patch("scripts.telegram_polling_runner._run_blocking", side_effect=_fake_run_blocking):
-            output, final_answer_sent = asyncio.run(
-                _run_with_progress_notifications(
-                    orchestrator=orchestrator,
-                    api=api,
-                    chat_id="100",
-                    user_id="200",
-                    text="hello",
-                    enabled=True,
-                    initial_delay_sec=0.1,
-                    interval_sec=0.1,
-                    message_template="working {elapsed_sec}s",
-                )
+        output, final_answer_sent = asyncio.run(
+            _run_with_progress_notifications(
+                orchestrator=orchestrator,
+                api=api,
+                chat_id="100",
+                user_id="200",
+                text="hello",
+                enabled=True,
+                initial_delay_sec=0.1,
+                interval_sec=0.1,
+                message_template="working {elapsed_sec}s",
             )
+        )
 
         self.assertEqual(output, "done")
         self.assertFalse(final_answer_sent)
@@ -518,23 +837,19 @@ poll_timeout = "30"
         )
         api = _FakeTelegramApi()
 
-        async def _fake_run_blocking(func, /, *args, **kwargs):
-            return func(*args, **kwargs)
-
-        with patch("scripts.telegram_polling_runner._run_blocking", side_effect=_fake_run_blocking):
-            output, final_answer_sent = asyncio.run(
-                _run_with_progress_notifications(
-                    orchestrator=orchestrator,
-                    api=api,
-                    chat_id="100",
-                    user_id="200",
-                    text="hello",
-                    enabled=True,
-                    initial_delay_sec=0.1,
-                    interval_sec=0.1,
-                    message_template="working {elapsed_sec}s",
-                )
+        output, final_answer_sent = asyncio.run(
+            _run_with_progress_notifications(
+                orchestrator=orchestrator,
+                api=api,
+                chat_id="100",
+                user_id="200",
+                text="hello",
+                enabled=True,
+                initial_delay_sec=0.1,
+                interval_sec=0.1,
+                message_template="working {elapsed_sec}s",
             )
+        )
 
         self.assertEqual(output, "done")
         self.assertFalse(final_answer_sent)
@@ -543,6 +858,51 @@ poll_timeout = "30"
             [("100", "[agent transfer] threadId:100:200\n[codex mcp-response] {\"mode\":\"single\"}")],
         )
 
+    def test_run_with_progress_notifications_restores_plan_workflow_callbacks(self) -> None:
+        def _original_mode_selected(mode: str, reason: str) -> None:
+            return None
+
+        class _PlanWorkflow:
+            def __init__(self) -> None:
+                self.on_mode_selected = _original_mode_selected
+                self.on_agent_transfer = None
+
+        class _PlanOrchestrator:
+            def __init__(self) -> None:
+                self.plan_workflow = _PlanWorkflow()
+                self.seen_callback = None
+
+            async def handle_message(self, chat_id: str, user_id: str, text: str) -> str:
+                self.seen_callback = self.plan_workflow.on_mode_selected
+                self.plan_workflow.on_agent_transfer("selector", "planner", 1)
+                return "done"
+
+        orchestrator = _PlanOrchestrator()
+        api = _FakeTelegramApi()
+
+        output, _ = asyncio.run(
+            _run_with_progress_notifications(
+                orchestrator=orchestrator,
+                api=api,
+                chat_id="100",
+                user_id="200",
+                text="hello",
+                enabled=True,
+                initial_delay_sec=0.1,
+                interval_sec=0.1,
+                message_template="working {elapsed_sec}s",
+            )
+        )
+
+        self.assertEqual(output, "done")
+        self.assertIsNot(orchestrator.seen_callback, _original_mode_selected)
+        self.assertIs(orchestrator.plan_workflow.on_mode_selected, _original_mode_selected)
+        self.assertIsNone(orchestrator.plan_workflow.on_agent_transfer)
+        self.assertEqual(
+            api.messages,
+            [("100", "[agent transfer] threadId:100:200\n[agent transfer] selector → planner (round 1)")],
+        )
+
     def test_process_inbound_request_skips_output_when_final_answer_was_forwarded(self) -> None:
         orchestrator = _ExecutorWiredOrchestrator(
             notifications=[
@@ -557,14 +917,8 @@ poll_timeout = "30"
         )
         api = _FakeTelegramApi()
 
-        async def _fake_run_blocking(func, /, *args, **kwargs):
-            return func(*args, **kwargs)
-
         async def _scenario() -> None:
-            with (
-                patch("scripts.telegram_polling_runner._close_codex_mcp") as mocked_close,
-                patch("scripts.telegram_polling_runner._run_blocking", side_effect=_fake_run_blocking),
-            ):
+            with patch("scripts.telegram_polling_runner._close_codex_mcp") as mocked_close:
                 await _process_inbound_request(
                     orchestrator=orchestrator,
                     api=api,
@@ -595,14 +949,8 @@ poll_timeout = "30"
         )
         api = _FakeTelegramApi()
 
-        async def _fake_run_blocking(func, /, *args, **kwargs):
-            return func(*args, **kwargs)
-
         async def _scenario() -> None:
-            with (
-                patch("scripts.telegram_polling_runner._close_codex_mcp") as mocked_close,
-                patch("scripts.telegram_polling_runner._run_blocking", side_effect=_fake_run_blocking),
-            ):
+            with patch("scripts.telegram_polling_runner._close_codex_mcp") as mocked_close:
                 await _process_inbound_request(
                     orchestrator=orchestrator,
                     api=api,
@@ -625,6 +973,474 @@ poll_timeout = "30"
         )
 
 
+class TelegramBotApiTests(unittest.TestCase):
+    def test_payload_codec_round_trips_with_and_without_orjson(self) -> None:
+        import scripts.telegram_polling_runner as runner
+
+        raw = '{"ok": true, "result": {"text": "안녕"}}'.encode("utf-8")
+        for codec in (runner.orjson, None):
+            with self.subTest(orjson=codec is not None):
+                with patch("scripts.telegram_polling_runner.orjson", codec):
+                    self.assertEqual(TelegramBotApi._parse_response(raw), {"text": "안녕"})
+                    encoded = TelegramBotApi._encode_payload({"text": "안녕"})
+                    self.assertEqual(
+                        TelegramBotApi._parse_response(b'{"ok":true,"result":' + encoded + b"}"),
+                        {"text": "안녕"},
+                    )
+                    with self.assertRaisesRegex(RuntimeError, "not valid json"):
+                        TelegramBotApi._parse_response(b"<html>")
+
+    def test_get_updates_body_matches_json_payload(self) -> None:
+        import json
+
+        self.assertEqual(
+            json.loads(TelegramBotApi._get_updates_body(12, 30)),
+            {"timeout": 30, "allowed_updates": ["message", "edited_message"], "offset": 12},
+        )
+        self.assertEqual(
+            json.loads(TelegramBotApi._get_updates_body(None, 0)),
+            {"timeout": 0, "allowed_updates": ["message", "edited_message"]},
+        )
+
+
+class _FakeHttpxResponse:
+    def __init__(self, content: bytes) -> None:
+        self.content = content
+
+
+class _FakeAsyncClient:
+    instances: list["_FakeAsyncClient"] = []
+
+    def __init__(self, *, base_url: str, timeout: float) -> None:
+        self.base_url = base_url
+        self.posts: list[tuple[str, bytes]] = []
+        self.closed = False
+        _FakeAsyncClient.instances.append(self)
+
+    async def post(
+        self,
+        url: str,
+        *,
+        content: bytes,
+        headers: dict[str, str],
+        timeout: float,
+    ) -> _FakeHttpxResponse:
+        self.posts.append((url, content))
+        return _FakeHttpxResponse(b'{"ok": true, "result": {}}')
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+class TelegramBotApiAsyncTests(unittest.TestCase):
+    def test_send_message_async_reuses_async_client(self) -> None:
+        _FakeAsyncClient.instances = []
+        fake_httpx = SimpleNamespace(AsyncClient=_FakeAsyncClient, HTTPError=Exception)
+        api = TelegramBotApi(token="abc")
+
+        async def _scenario() -> None:
+            await api.send_message_async(chat_id="100", text="one")
+            await api.send_message_async(chat_id="100", text="two")
+            await api.aclose()
+
+        with patch("scripts.telegram_polling_runner.httpx", fake_httpx):
+            asyncio.run(_scenario())
+
+        self.assertEqual(len(_FakeAsyncClient.instances), 1)
+        client = _FakeAsyncClient.instances[0]
+        self.assertEqual(client.base_url, "https://api.telegram.org")
+        self.assertEqual([url for url, _ in client.posts], ["/botabc/sendMessage"] * 2)
+        self.assertTrue(client.closed)
+
+    def test_poll_updates_awaits_async_client_with_long_poll_timeout(self) -> None:
+        class _PollingClient(_FakeAsyncClient):
+            def __init__(self, *, base_url: str, timeout: float) -> None:
+                super().__init__(base_url=base_url, timeout=timeout)
+                self.timeouts: list[float] = []
+
+            async def post(self, url: str, *, content: bytes, headers: dict[str, str], timeout: float):
+                self.timeouts.append(timeout)
+                self.posts.append((url, content))
+                return _FakeHttpxResponse(b'{"ok": true, "result": [{"update_id": 3}, "bad"]}')
+
+        _FakeAsyncClient.instances = []
+        fake_httpx = SimpleNamespace(AsyncClient=_PollingClient, HTTPError=Exception)
+        api = TelegramBotApi(token="abc")
+        with patch("scripts.telegram_polling_runner.httpx", fake_httpx):
+            updates = asyncio.run(_poll_updates(api, offset=2, timeout=30))
+
+        client = _FakeAsyncClient.instances[0]
+        self.assertEqual(updates, [{"update_id": 3}])
+        self.assertEqual(client.posts[0][0], "/botabc/getUpdates")
+        self.assertEqual(client.timeouts, [40])
+
+    def test_delete_webhook_posts_on_async_client(self) -> None:
+        _FakeAsyncClient.instances = []
+        fake_httpx = SimpleNamespace(AsyncClient=_FakeAsyncClient, HTTPError=Exception)
+        api = TelegramBotApi(token="abc")
+        with patch("scripts.telegram_polling_runner.httpx", fake_httpx):
+            asyncio.run(api.delete_webhook(drop_pending_updates=True))
+
+        client = _FakeAsyncClient.instances[0]
+        self.assertEqual(client.posts, [("/botabc/deleteWebhook", b'{"drop_pending_updates":true}')])
+
+    def test_post_retries_idempotent_methods_once_after_remote_disconnect(self) -> None:
+        class _DroppingClient(_FakeAsyncClient):
+            async def post(self, url: str, *, content: bytes, headers: dict[str, str], timeout: float):
+                self.posts.append((url, content))
+                if len(self.posts) % 2:
+                    raise httpx.RemoteProtocolError("Server disconnected without sending a response.")
+                return _FakeHttpxResponse(b'{"ok": true, "result": []}')
+
+        _FakeAsyncClient.instances = []
+        api = TelegramBotApi(token="abc")
+
+        async def _scenario() -> None:
+            self.assertEqual(await api.get_updates_async(offset=None, timeout=0), [])
+            await api.delete_webhook()
+
+        with patch("scripts.telegram_polling_runner.httpx.AsyncClient", _DroppingClient):
+            asyncio.run(_scenario())
+
+        self.assertEqual(
+            [url for url, _ in _FakeAsyncClient.instances[0].posts],
+            ["/botabc/getUpdates"] * 2 + ["/botabc/deleteWebhook"] * 2,
+        )
+
+    def test_send_message_is_not_retried_after_remote_disconnect(self) -> None:
+        class _DroppingClient(_FakeAsyncClient):
+            async def post(self, url: str, *, content: bytes, headers: dict[str, str], timeout: float):
+                self.posts.append((url, content))
+                raise httpx.RemoteProtocolError("Server disconnected without sending a response.")
+
+        _FakeAsyncClient.instances = []
+        api = TelegramBotApi(token="abc")
+        with patch("scripts.telegram_polling_runner.httpx.AsyncClient", _DroppingClient):
+            with self.assertRaisesRegex(RuntimeError, "telegram request failed"):
+                asyncio.run(api.send_message_async(chat_id="100", text="hi"))
+
+        self.assertEqual(len(_FakeAsyncClient.instances[0].posts), 1)
+
+    def test_post_wraps_http_errors(self) -> None:
+        class _FailingClient(_FakeAsyncClient):
+            async def post(self, url: str, *, content: bytes, headers: dict[str, str], timeout: float):
+                raise httpx.ConnectError("unreachable")
+
+        api = TelegramBotApi(token="abc")
+        with patch("scripts.telegram_polling_runner.httpx.AsyncClient", _FailingClient):
+            with self.assertRaisesRegex(RuntimeError, "telegram request failed: unreachable"):
+                asyncio.run(api.send_message_async(chat_id="100", text="hi"))
+
+
+class _LoopTelegramApi(_FakeTelegramApi):
+    def __init__(self, batches: list[list[dict]]) -> None:
+        super().__init__()
+        self.batches = batches
+        self.closed = False
+
+    async def delete_webhook(self, drop_pending_updates: bool = False) -> None:
+        pass
+
+    async def get_updates_async(self, *, offset: int | None, timeout: int) -> list[dict]:
+        if not self.batches:
+            await asyncio.Event().wait()
+        return self.batches.pop(0)
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+class _BlockingOrchestrator:
+    def __init__(self) -> None:
+        self.texts: list[str] = []
+        self.cancelled: list[str] = []
+
+    async def handle_message(self, chat_id: str, user_id: str, text: str) -> str:
+        self.texts.append(text)
+        if text == "/cancel":
+            return "No running task to cancel."
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            self.cancelled.append(text)
+            raise
+        return "done"
+
+
+class RunPollingLoopTests(unittest.TestCase):
+    def test_loop_rejects_queues_and_cancels_per_chat(self) -> None:
+        def _update(update_id: int, chat_id: int, user_id: int, text: str) -> dict:
+            return {
+                "update_id": update_id,
+                "message": {"text": text, "chat": {"id": chat_id}, "from": {"id": user_id}},
+            }
+
+        api = _LoopTelegramApi(
+            [
+                [
+                    _update(1, 100, 999, "intruder"),
+                    _update(2, 100, 200, "first"),
+                    _update(3, 100, 200, "second"),
+                    _update(4, 300, 200, "other"),
+                    _update(5, 300, 200, "/cancel"),
+                ]
+            ]
+        )
+        orchestrator = _BlockingOrchestrator()
+
+        async def _scenario() -> None:
+            polling = asyncio.create_task(_run_polling())
+            while len(api.messages) < 4:
+                await asyncio.sleep(0.01)
+            # Chat 300's /cancel must not reach chat 100's running request.
+            self.assertEqual(orchestrator.cancelled, [])
+            polling.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await polling
+
+        with tempfile.TemporaryDirectory() as tmp:
+            conf_path = Path(tmp) / "conf.toml"
+            conf_path.write_text(
+                "[telegram]\nallowed_users = [200]\n\n"
+                "[telegram.polling]\ndelete_webhook_on_start = false\n"
+                "ignore_pending_updates_on_start = false\nrequire_mcp_warmup = false\n",
+                encoding="utf-8",
+            )
+            env = {"CODEX_CONF_PATH": str(conf_path), "TELEGRAM_BOT_TOKEN": "abc"}
+            with (
+                patch.dict("os.environ", env, clear=True),
+                patch("scripts.telegram_polling_runner.TelegramBotApi", return_value=api),
+                patch("scripts.telegram_polling_runner.build_orchestrator", return_value=orchestrator),
+                patch("scripts.telegram_polling_runner._log"),
+            ):
+                asyncio.run(_scenario())
+
+        self.assertEqual(
+            api.messages,
+            [
+                ("100", "Unauthorized"),
+                ("100", "A task is already running. Your request has been queued."),
+                ("300", "A task is already running. Your request has been queued."),
+                ("300", "Dropped 1 queued request(s)."),
+            ],
+        )
+        # Chat 300's dropped request never ran.
+        self.assertEqual(sorted(orchestrator.texts), ["/cancel", "first"])
+        self.assertTrue(api.closed)
+
+
+def _inbound(chat_id: str, text: str) -> TelegramInboundMessage:
+    return TelegramInboundMessage(chat_id=chat_id, user_id="200", text=text)
+
+
+class ChatRequestQueuesTests(unittest.TestCase):
+    def test_requests_run_one_at_a_time_in_submission_order(self) -> None:
+        events: list[str] = []
+
+        async def _run_request(inbound: TelegramInboundMessage) -> None:
+            events.append(f"start {inbound.chat_id}:{inbound.text}")
+            await asyncio.sleep(0.01)
+            events.append(f"end {inbound.chat_id}:{inbound.text}")
+
+        async def _scenario() -> None:
+            queues = _ChatRequestQueues(run_request=_run_request, max_backlog=5)
+            self.assertFalse(queues.is_busy())
+            self.assertTrue(queues.submit(_inbound("100", "a")))
+            self.assertTrue(queues.submit(_inbound("200", "b")))
+            self.assertTrue(queues.submit(_inbound("100", "c")))
+            self.assertTrue(queues.is_busy())
+            while queues.is_busy() or queues._workers:
+                await asyncio.sleep(0.01)
+
+        asyncio.run(_scenario())
+        self.assertEqual(
+            events,
+            ["start 100:a", "end 100:a", "start 200:b", "end 200:b", "start 100:c", "end 100:c"],
+        )
+
+    def test_submit_rejects_when_chat_backlog_is_full(self) -> None:
+        async def _run_request(inbound: TelegramInboundMessage) -> None:
+            await asyncio.sleep(30)
+
+        async def _scenario() -> list[bool]:
+            queues = _ChatRequestQueues(run_request=_run_request, max_backlog=1)
+            results = [queues.submit(_inbound("100", "a"))]
+            await asyncio.sleep(0)
+            results.append(queues.submit(_inbound("100", "b")))
+            results.append(queues.submit(_inbound("100", "c")))
+            results.append(queues.submit(_inbound("300", "d")))
+            active_task = queues.active_task
+            await queues.close()
+            results.append(active_task is not None and active_task.cancelled())
+            return results
+
+        self.assertEqual(asyncio.run(_scenario()), [True, True, False, True, True])
+
+    def test_drop_backlog_discards_only_that_chats_queued_requests(self) -> None:
+        events: list[str] = []
+
+        async def _run_request(inbound: TelegramInboundMessage) -> None:
+            events.append(f"{inbound.chat_id}:{inbound.text}")
+            await asyncio.sleep(0.01)
+
+        async def _scenario() -> int:
+            queues = _ChatRequestQueues(run_request=_run_request, max_backlog=5)
+            queues.submit(_inbound("100", "a"))
+            queues.submit(_inbound("200", "b"))
+            queues.submit(_inbound("100", "c"))
+            queues.submit(_inbound("200", "d"))
+            await asyncio.sleep(0)
+            dropped = queues.drop_backlog("200")
+            while queues.is_busy() or queues._workers:
+                await asyncio.sleep(0.01)
+            return dropped
+
+        self.assertEqual(asyncio.run(_scenario()), 2)
+        self.assertEqual(events, ["100:a", "100:c"])
+
+    def test_active_task_for_matches_only_the_running_chat(self) -> None:
+        async def _run_request(inbound: TelegramInboundMessage) -> None:
+            await asyncio.sleep(30)
+
+        async def _scenario() -> None:
+            queues = _ChatRequestQueues(run_request=_run_request, max_backlog=1)
+            queues.submit(_inbound("100", "a"))
+            await asyncio.sleep(0)
+            self.assertIsNone(queues.active_task_for("200"))
+            self.assertIs(queues.active_task_for("100"), queues.active_task)
+            self.assertIsNotNone(queues.active_task)
+            await queues.close()
+
+        asyncio.run(_scenario())
+
+    def test_close_logs_request_failures_raised_during_shutdown(self) -> None:
+        async def _run_request(inbound: TelegramInboundMessage) -> None:
+            try:
+                await asyncio.sleep(30)
+            except asyncio.CancelledError:
+                raise RuntimeError("cleanup failed")
+
+        async def _scenario() -> None:
+            queues = _ChatRequestQueues(run_request=_run_request, max_backlog=1)
+            queues.submit(_inbound("100", "a"))
+            await asyncio.sleep(0.01)
+            await queues.close()
+
+        with patch("scripts.telegram_polling_runner._log") as mocked_log:
+            asyncio.run(_scenario())
+
+        mocked_log.assert_called_once_with(
+            "[warn] request task failed during shutdown: cleanup failed"
+        )
+
+
+class GracefulShutdownTests(unittest.TestCase):
+    def test_install_registers_sigint_and_sigterm(self) -> None:
+        class _RecordingLoop:
+            def __init__(self) -> None:
+                self.signals: list[int] = []
+
+            def add_signal_handler(self, signum: int, callback) -> None:
+                self.signals.append(signum)
+
+        loop = _RecordingLoop()
+        _GracefulShutdown(None).install(loop)
+        self.assertEqual(loop.signals, [signal.SIGINT, signal.SIGTERM])
+
+    def test_repeated_signals_cancel_the_task_once(self) -> None:
+        async def _scenario() -> tuple[bool, int]:
+            cleanup_runs = 0
+
+            async def _polling() -> None:
+                nonlocal cleanup_runs
+                try:
+                    await asyncio.sleep(30)
+                finally:
+                    shutdown._request()
+                    await asyncio.sleep(0)
+                    cleanup_runs += 1
+
+            task = asyncio.create_task(_polling())
+            shutdown = _GracefulShutdown(task)
+            await asyncio.sleep(0)
+            shutdown._request()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            return shutdown.requested, cleanup_runs
+
+        self.assertEqual(asyncio.run(_scenario()), (True, 1))
+
+
+class SafeSendTests(unittest.TestCase):
+    def test_safe_send_posts_chunks_in_order(self) -> None:
+        api = _FakeTelegramApi()
+        text = "a" * 4096 + "\n" + "b" * 10
+
+        asyncio.run(_safe_send(api, "100", text))
+
+        self.assertEqual(api.messages, [("100", "a" * 4096), ("100", "b" * 10)])
+
+    def test_concurrent_safe_sends_to_same_chat_do_not_interleave(self) -> None:
+        class _SlowApi(_FakeTelegramApi):
+            async def send_message_async(self, *, chat_id: str, text: str) -> None:
+                await asyncio.sleep(0)
+                self.send_message(chat_id=chat_id, text=text)
+
+        api = _SlowApi()
+
+        async def _scenario() -> None:
+            await asyncio.gather(
+                _safe_send(api, "100", "a" * 4096 + "\n" + "a"),
+                _safe_send(api, "100", "b" * 4096 + "\n" + "b"),
+            )
+
+        asyncio.run(_scenario())
+        self.assertEqual(
+            [text[0] for _, text in api.messages],
+            ["a", "a", "b", "b"],
+        )
+
+    def test_safe_send_keeps_sending_after_a_failed_chunk(self) -> None:
+        class _FlakyApi:
+            def __init__(self) -> None:
+                self.sent: list[str] = []
+                self.calls = 0
+
+            async def send_message_async(self, *, chat_id: str, text: str) -> None:
+                self.calls += 1
+                if self.calls == 1:
+                    raise RuntimeError("telegram request failed")
+                self.sent.append(text)
+
+        api = _FlakyApi()
+        with patch("scripts.telegram_polling_runner._log") as mocked_stdout:
+            asyncio.run(_safe_send(api, "100", "a" * 5000))
+
+        self.assertEqual(api.calls, 2)
+        self.assertEqual(len(api.sent), 1)
+        mocked_stdout.assert_called_once_with(
+            "[warn] failed to send telegram message: telegram request failed"
+        )
+
+    def test_safe_send_logs_each_failed_chunk(self) -> None:
+        class _FailingApi:
+            def __init__(self) -> None:
+                self.calls = 0
+
+            async def send_message_async(self, *, chat_id: str, text: str) -> None:
+                self.calls += 1
+                raise RuntimeError("telegram request failed")
+
+        api = _FailingApi()
+        with patch("scripts.telegram_polling_runner._log") as mocked_stdout:
+            asyncio.run(_safe_send(api, "100", "a" * 5000))
+
+        self.assertEqual(api.calls, 2)
+        self.assertEqual(mocked_stdout.call_count, 2)
+
+
 class AgentMessageDispatcherTests(unittest.TestCase):
     def test_dispatch_prints_and_sends_to_stdout_and_telegram(self) -> None:
         api = _FakeTelegramApi()
@@ -638,18 +1454,11 @@ class AgentMessageDispatcherTests(unittest.TestCase):
                 loop=asyncio.get_running_loop(),
             )
 
-            def _run_blocking_sync(func, /, *args, **kwargs):
-                return func(*args, **kwargs)
-
             def _stub_safe_send(api_obj: _FakeTelegramApi, chat_id: str, text: str) -> None:
                 api_obj.send_message(chat_id=chat_id, text=text)
 
             with (
-                patch("scripts.telegram_polling_runner._stdout_print") as mocked_stdout,
-                patch(
-                    "scripts.telegram_polling_runner._run_blocking",
-                    side_effect=_run_blocking_sync,
-                ),
+                patch("scripts.telegram_polling_runner._log") as mocked_stdout,
                 patch("scripts.telegram_polling_runner._safe_send", side_effect=_stub_safe_send),
             ):
                 dispatcher.dispatch(message_text)
@@ -661,5 +1470,43 @@ class AgentMessageDispatcherTests(unittest.TestCase):
 
         asyncio.run(_scenario())
 
+    def test_dispatch_from_worker_thread_coalesces_burst_in_order(self) -> None:
+        api = _FakeTelegramApi()
+
+        async def _scenario() -> None:
+            dispatcher = _AgentMessageDispatcher(
+                api=api,
+                chat_id="100",
+                user_id="200",
+                loop=asyncio.get_running_loop(),
+            )
+
+            def _stub_safe_send(api_obj: _FakeTelegramApi, chat_id: str, text: str) -> None:
+                api_obj.send_message(chat_id=chat_id, text=text)
+
+            def _dispatch_burst() -> None:
+                for index in range(5):
+                    dispatcher.dispatch(f"step {index}")
+
+            with (
+                patch("scripts.telegram_polling_runner._log"),
+                patch("scripts.telegram_polling_runner._safe_send", side_effect=_stub_safe_send),
+            ):
+                await asyncio.to_thread(_dispatch_burst)
+                await dispatcher.drain()
+
+            self.assertEqual(
+                api.messages,
+                [
+                    (
+                        "100",
+                        "[agent transfer] threadId:100:200\n"
+                        + "\n".join(f"step {index}" for index in range(5)),
+                    )
+                ],
+            )
+
+        asyncio.run(_scenario())
+
 if __name__ == "__main__":
     unittest.main()